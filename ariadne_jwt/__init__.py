@@ -1,4 +1,7 @@
 from .mutations import (resolve_verify, resolve_refresh, resolve_revoke, resolve_token_auth, jwt_schema)
 from .scalar import GenericScalar
+from .directives import jwt_directives
+from .validation import jwt_validation_rules
 
-__all__ = ['resolve_verify', 'resolve_refresh', 'resolve_revoke', 'resolve_token_auth', 'jwt_schema', 'GenericScalar', ]
+__all__ = ['resolve_verify', 'resolve_refresh', 'resolve_revoke', 'resolve_token_auth', 'jwt_schema', 'jwt_directives',
+           'jwt_validation_rules', 'GenericScalar', ]
@@ -1,17 +1,46 @@
-from .shortcuts import get_user_by_token
-from .utils import get_authorization_header, get_user_by_natural_key
+from asgiref.sync import sync_to_async
+
+from .settings import jwt_settings
+from .utils import (get_authorization_header, get_payload,
+                    get_user_by_natural_key, get_user_by_payload,
+                    get_user_by_pk, set_request_payload)
 
 
 class JSONWebTokenBackend(object):
 
-    def authenticate(self, request=None, **credentials):
+    def get_token_payload(self, request):
         if request is None:
             return None
 
         token = get_authorization_header(request)
-        if token is not None:
-            return get_user_by_token(token, context={'request': request})
-        return None
+        if token is None:
+            return None
+
+        payload = get_payload(token, context={'request': request})
+        set_request_payload(request, token, payload)
+        return payload
+
+    def authenticate(self, request=None, **credentials):
+        payload = self.get_token_payload(request)
+
+        if payload is None:
+            return None
+
+        if jwt_settings.JWT_CLAIMS_USER:
+            return jwt_settings.JWT_CLAIMS_USER_CLASS(payload)
+        return get_user_by_payload(payload)
+
+    async def aauthenticate(self, request=None, **credentials):
+        payload = self.get_token_payload(request)
+
+        if payload is None:
+            return None
+
+        if jwt_settings.JWT_CLAIMS_USER:
+            return jwt_settings.JWT_CLAIMS_USER_CLASS(payload)
+        return await sync_to_async(get_user_by_payload)(payload)
 
     def get_user(self, user_id):
+        if jwt_settings.JWT_USER_PK_CLAIM is not None:
+            return get_user_by_pk(user_id)
         return get_user_by_natural_key(user_id)
@@ -0,0 +1,241 @@
+import copy
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models.signals import post_delete, post_save
+
+from .settings import jwt_settings
+from .signals import settings_reloaded
+
+__all__ = [
+    'LRUCache',
+    'get_token_cache',
+    'get_cached_payload',
+    'cache_payload',
+    'get_rejected_token_cache',
+    'get_cached_rejection',
+    'cache_rejection',
+    'get_cached_user',
+    'cache_user',
+    'invalidate_user',
+]
+
+
+class LRUCache(object):
+    """Thread-safe LRU mapping whose entries may carry an expiration time"""
+
+    def __init__(self, max_size, timer=time.time):
+        self.max_size = max_size
+        self.timer = timer
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                value, expires = self._data[key]
+            except KeyError:
+                self.misses += 1
+                return default
+
+            if expires is not None and expires <= self.timer():
+                del self._data[key]
+                self.misses += 1
+                return default
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value, expires=None):
+        with self._lock:
+            self._data[key] = (value, expires)
+            self._data.move_to_end(key)
+
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'size': len(self._data),
+            'max_size': self.max_size,
+        }
+
+
+_caches = {}
+
+
+def get_cache(name, max_size):
+    cache = _caches.get(name)
+
+    if cache is None:
+        cache = _caches.setdefault(name, LRUCache(max_size))
+    return cache
+
+
+def clear_caches(*args, **kwargs):
+    _caches.clear()
+
+
+settings_reloaded.connect(clear_caches)
+
+
+def token_digest(token):
+    if not isinstance(token, bytes):
+        token = token.encode('utf-8')
+    return hashlib.sha256(token).digest()
+
+
+def get_token_cache():
+    return get_cache('token', jwt_settings.JWT_TOKEN_CACHE_MAX_SIZE)
+
+
+def get_cached_payload(token):
+    payload = get_token_cache().get(token_digest(token))
+
+    if payload is not None:
+        return dict(payload)
+    return None
+
+
+def cache_payload(token, payload):
+    exp = payload.get('exp')
+
+    if not isinstance(exp, (int, float)):
+        return
+
+    leeway = jwt_settings.JWT_LEEWAY
+
+    if isinstance(leeway, timedelta):
+        leeway = leeway.total_seconds()
+
+    get_token_cache().set(token_digest(token), dict(payload), exp - leeway)
+
+
+def get_rejected_token_cache():
+    return get_cache('rejected_token',
+                     jwt_settings.JWT_REJECTED_TOKEN_CACHE_MAX_SIZE)
+
+
+def get_cached_rejection(token):
+    rejection = get_rejected_token_cache().get(token_digest(token))
+
+    if rejection is not None:
+        error_class, message = rejection
+        return error_class(message)
+    return None
+
+
+def cache_rejection(token, error):
+    cache = get_rejected_token_cache()
+    ttl = jwt_settings.JWT_REJECTED_TOKEN_CACHE_TTL.total_seconds()
+    cache.set(token_digest(token), (error.__class__, str(error)),
+              cache.timer() + ttl)
+
+
+def user_cache_key(kind, value):
+    digest = hashlib.sha256(str(value).encode('utf-8')).hexdigest()
+    return 'ariadne_jwt:user:{}:{}'.format(kind, digest)
+
+
+def get_cached_user(kind, value):
+    """Returns the cached user, False if it is known not to exist or None"""
+    key = user_cache_key(kind, value)
+    alias = jwt_settings.JWT_USER_CACHE_ALIAS
+
+    if alias is not None:
+        return caches[alias].get(key)
+
+    user = get_cache('user', jwt_settings.JWT_USER_CACHE_MAX_SIZE).get(key)
+
+    if user:
+        return copy.copy(user)
+    return user
+
+
+def cache_user(kind, value, user):
+    key = user_cache_key(kind, value)
+    alias = jwt_settings.JWT_USER_CACHE_ALIAS
+
+    if user is None:
+        user = False
+        timeout = jwt_settings.JWT_USER_CACHE_MISSING_TIMEOUT.total_seconds()
+        index_key = None
+    else:
+        timeout = jwt_settings.JWT_USER_CACHE_TIMEOUT.total_seconds()
+        # Every key the user is cached under, invalidated together
+        index_key = user_cache_key('index', user.pk)
+
+    if alias is not None:
+        cache = caches[alias]
+        values = {key: user}
+
+        if index_key is not None:
+            values[index_key] = (cache.get(index_key) or frozenset()) | {key}
+
+        cache.set_many(values, timeout)
+        return
+
+    cache = get_cache('user', jwt_settings.JWT_USER_CACHE_MAX_SIZE)
+    expires = cache.timer() + timeout
+
+    if index_key is not None:
+        keys = (cache.get(index_key) or frozenset()) | {key}
+        cache.set(index_key, keys, expires)
+    cache.set(key, copy.copy(user) if user else user, expires)
+
+
+def invalidate_user(sender, instance, **kwargs):
+    if not jwt_settings.JWT_USER_CACHE:
+        return
+
+    username = instance.get_username()
+
+    if hasattr(username, 'pk'):
+        username = username.pk
+
+    index_key = user_cache_key('index', instance.pk)
+    keys = [
+        index_key,
+        user_cache_key('username', username),
+        user_cache_key('pk', instance.pk),
+    ]
+    alias = jwt_settings.JWT_USER_CACHE_ALIAS
+
+    if alias is not None:
+        cache = caches[alias]
+        keys.extend(cache.get(index_key) or ())
+        cache.delete_many(keys)
+        return
+
+    cache = get_cache('user', jwt_settings.JWT_USER_CACHE_MAX_SIZE)
+    keys.extend(cache.get(index_key) or ())
+
+    for key in keys:
+        cache.delete(key)
+
+
+post_save.connect(invalidate_user, sender=settings.AUTH_USER_MODEL)
+post_delete.connect(invalidate_user, sender=settings.AUTH_USER_MODEL)
@@ -0,0 +1,82 @@
+from django.utils.translation import gettext as _
+
+from . import exceptions
+from .settings import jwt_settings
+from .utils import get_user_by_payload
+
+__all__ = [
+    'ClaimsUser',
+]
+
+
+class ClaimsUser(object):
+    """User built from the verified token claims, without a database query
+
+    Attributes that are not carried by the token are read from the actual
+    user instance, which is loaded on first access. The token is trusted
+    until it expires, so ``is_active`` is always true: a deleted or disabled
+    user only raises ``JSONWebTokenError`` once the actual user is loaded.
+    """
+
+    is_active = True
+    is_anonymous = False
+    is_authenticated = True
+
+    def __init__(self, payload):
+        self.payload = payload
+        self.is_staff = bool(payload.get('isStaff'))
+        self.is_superuser = bool(payload.get('isSuperuser'))
+        self.group_names = frozenset(payload.get('groups') or ())
+
+        pk_claim = jwt_settings.JWT_USER_PK_CLAIM
+        self.pk = self.id = payload.get(pk_claim) if pk_claim else None
+
+    def __str__(self):
+        return str(self.get_username())
+
+    def __eq__(self, other):
+        if isinstance(other, ClaimsUser):
+            other = other.get_user()
+        return self.get_user() == other
+
+    def __hash__(self):
+        if self.pk is None:
+            return hash(self.get_user())
+        return hash(self.pk)
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return getattr(self.get_user(), name)
+
+    def get_user(self):
+        if not hasattr(self, '_user'):
+            user = get_user_by_payload(self.payload)
+
+            if user is None:
+                raise exceptions.JSONWebTokenError(_('Invalid payload'))
+            self._user = user
+        return self._user
+
+    def get_username(self):
+        username = jwt_settings.JWT_PAYLOAD_GET_USERNAME_HANDLER(self.payload)
+
+        if username is None:  # Compact tokens carrying the primary key only
+            return self.get_user().get_username()
+        return username
+
+    def has_perm(self, perm, obj=None):
+        if self.is_superuser:
+            return True
+        return self.get_user().has_perm(perm, obj)
+
+    def has_perms(self, perm_list, obj=None):
+        if self.is_superuser:
+            return True
+        return self.get_user().has_perms(perm_list, obj)
+
+    def has_module_perms(self, app_label):
+        if self.is_superuser:
+            return True
+        return self.get_user().has_module_perms(app_label)
+
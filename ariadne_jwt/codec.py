@@ -0,0 +1,282 @@
+import importlib
+import json
+import re
+from calendar import timegm
+from datetime import datetime
+
+import jwt
+from django.core.exceptions import ImproperlyConfigured
+from jwt.algorithms import HMACAlgorithm, get_default_algorithms
+from jwt.utils import base64url_encode
+
+from .settings import jwt_settings
+from .signals import settings_reloaded
+
+__all__ = [
+    'JSONWebToken',
+    'JSONWebTokenCodec',
+    'get_json_codec',
+    'get_codec',
+]
+
+
+def is_symmetric(algorithm):
+    return isinstance(get_default_algorithms().get(algorithm), HMACAlgorithm)
+
+
+def prepare_key(algorithm, key):
+    alg_obj = get_default_algorithms().get(algorithm)
+
+    if alg_obj is None or key is None:
+        return key
+    return alg_obj.prepare_key(key)
+
+
+def prepare_verifying_key(algorithm, key):
+    key = prepare_key(algorithm, key)
+
+    if not is_symmetric(algorithm) and hasattr(key, 'public_key'):
+        return key.public_key()
+    return key
+
+
+def get_pyjwt_version():
+    return tuple(int(part) for part in re.findall(r'\d+', jwt.__version__)[:2])
+
+
+# JSONWebToken overrides private PyJWT hooks, only relied on within the
+# tested range: other versions serialize payloads with the json module
+PAYLOAD_HOOKS_VERSIONS = ((2, 7), (3, 0))
+PAYLOAD_HOOKS = (
+    PAYLOAD_HOOKS_VERSIONS[0] <= get_pyjwt_version() < PAYLOAD_HOOKS_VERSIONS[1]
+    and hasattr(jwt.PyJWT, '_encode_payload')
+    and hasattr(jwt.PyJWT, '_decode_payload'))
+
+
+def json_dumps(obj):
+    return json.dumps(obj, separators=(',', ':')).encode('utf-8')
+
+
+def get_json_codec(name):
+    """Returns the ``(dumps, loads)`` functions of a JSON module
+
+    ``'auto'`` picks orjson when it is installed and the standard library
+    otherwise. ``dumps`` always returns bytes.
+    """
+    if name == 'auto':
+        try:
+            import orjson  # noqa: F401
+        except ImportError:
+            name = 'json'
+        else:
+            name = 'orjson'
+
+    if name == 'json':
+        return json_dumps, json.loads
+
+    module = importlib.import_module(name)
+
+    if name == 'orjson':
+        return module.dumps, module.loads
+
+    def dumps(obj):
+        data = module.dumps(obj)
+
+        if isinstance(data, str):
+            return data.encode('utf-8')
+        return data
+
+    return dumps, module.loads
+
+
+class JSONWebToken(jwt.PyJWT):
+    """PyJWT serializing payloads with the given JSON functions"""
+
+    def __init__(self, dumps=json_dumps, loads=json.loads, options=None):
+        super(JSONWebToken, self).__init__(options)
+        self.dumps = dumps
+        self.loads = loads
+
+    def _encode_payload(self, payload, headers=None, json_encoder=None):
+        return self.dumps(payload)
+
+    def _decode_payload(self, decoded):
+        try:
+            payload = self.loads(decoded['payload'])
+        except (ValueError, RecursionError) as e:
+            raise jwt.DecodeError('Invalid payload string: {}'.format(e))
+
+        if not isinstance(payload, dict):
+            raise jwt.DecodeError(
+                'Invalid payload string: must be a json object')
+        return payload
+
+
+class JSONWebTokenCodec(object):
+    """Encodes and decodes tokens with pre-parsed keys and options"""
+
+    def __init__(self, algorithm, secret_key=None, private_key=None,
+                 public_key=None, keyring=None, key_id=None, leeway=0,
+                 audience=None, issuer=None, verify_expiration=False,
+                 json_codec='json', keyring_default_key=False):
+        self.algorithm = algorithm
+        self.algorithms = [algorithm]
+        self.keys = {
+            kid: prepare_verifying_key(algorithm, key)
+            for kid, key in (keyring or {}).items()
+        }
+        self.keyring_default_key = keyring_default_key
+
+        if self.keys and key_id not in self.keys and (
+                key_id is not None or
+                (is_symmetric(algorithm) and not keyring_default_key)):
+            # Tokens signed with this codec would fail to decode
+            raise ImproperlyConfigured(
+                'JWT_KEY_ID {!r} is not in JWT_KEYRING'.format(key_id))
+
+        if is_symmetric(algorithm):
+            self.verifying_key = prepare_key(algorithm, secret_key)
+            self.signing_key = self.keys.get(key_id, self.verifying_key)
+        else:
+            self.signing_key = prepare_key(algorithm, private_key)
+            self.verifying_key = prepare_verifying_key(
+                algorithm, public_key or self.signing_key)
+
+        self.headers = {'kid': key_id} if key_id is not None else None
+
+        self.leeway = leeway
+        self.audience = audience
+        self.issuer = issuer
+        self.options = {
+            'verify_exp': verify_expiration,
+        }
+
+        if not PAYLOAD_HOOKS and json_codec != 'json':
+            if json_codec != 'auto':
+                raise ImproperlyConfigured(
+                    'JWT_JSON_CODEC {!r} requires PyJWT>={},<{}'.format(
+                        json_codec,
+                        *('.'.join(map(str, version))
+                          for version in PAYLOAD_HOOKS_VERSIONS)))
+            json_codec = 'json'
+
+        self.jwt = JSONWebToken(*get_json_codec(json_codec))
+
+    @classmethod
+    def from_settings(cls, settings=jwt_settings):
+        return cls(
+            algorithm=settings.JWT_ALGORITHM,
+            secret_key=settings.JWT_SECRET_KEY,
+            private_key=settings.JWT_PRIVATE_KEY,
+            public_key=settings.JWT_PUBLIC_KEY,
+            keyring=settings.JWT_KEYRING,
+            key_id=settings.JWT_KEY_ID,
+            keyring_default_key=settings.JWT_KEYRING_DEFAULT_KEY,
+            leeway=settings.JWT_LEEWAY,
+            audience=settings.JWT_AUDIENCE,
+            issuer=settings.JWT_ISSUER,
+            verify_expiration=settings.JWT_VERIFY_EXPIRATION,
+            json_codec=settings.JWT_JSON_CODEC)
+
+    def encode(self, payload):
+        if self.signing_key is None:
+            raise ImproperlyConfigured(
+                'JWT_PRIVATE_KEY is required to sign tokens with {}'.format(
+                    self.algorithm))
+
+        token = self.jwt.encode(payload, self.signing_key, self.algorithm,
+                                headers=self.headers)
+
+        # As of v2.0.0, PyJWT tokens are returned as string instead of a byte string
+        if isinstance(token, bytes):
+            return token.decode('utf-8')
+        return token
+
+    def get_signer(self):
+        """Returns a function signing payloads with a pre-encoded header
+
+        The header segment, the algorithm and the key are resolved once, so
+        signing many payloads only serializes and signs each of them.
+        """
+        if self.signing_key is None:
+            raise ImproperlyConfigured(
+                'JWT_PRIVATE_KEY is required to sign tokens with {}'.format(
+                    self.algorithm))
+
+        alg_obj = get_default_algorithms()[self.algorithm]
+        key = self.signing_key
+        dumps = self.jwt.dumps
+        # PyJWS builds and validates the header, which every token shares
+        header_segment = jwt.PyJWS().encode(
+            b'', key, self.algorithm, headers=self.headers)
+
+        if not isinstance(header_segment, bytes):  # PyJWT >= 2.0.0
+            header_segment = header_segment.encode('utf-8')
+
+        header_segment = header_segment.split(b'.', 1)[0]
+
+        def sign(payload):
+            for claim in ('exp', 'iat', 'nbf'):
+                if isinstance(payload.get(claim), datetime):
+                    payload[claim] = timegm(payload[claim].utctimetuple())
+
+            signing_input = b'.'.join((
+                header_segment,
+                base64url_encode(dumps(payload))))
+
+            signature = base64url_encode(alg_obj.sign(signing_input, key))
+            return b'.'.join((signing_input, signature)).decode('utf-8')
+
+        return sign
+
+    def get_verifying_key(self, token):
+        if not self.keys:
+            return self.verifying_key
+
+        kid = jwt.get_unverified_header(token).get('kid')
+
+        if kid is None:
+            if self.keyring_default_key:
+                return self.verifying_key
+            raise jwt.InvalidTokenError('Missing key id')
+
+        try:
+            return self.keys[kid]
+        except (KeyError, TypeError):
+            raise jwt.InvalidTokenError('Unknown key id')
+
+    def decode(self, token):
+        key = self.get_verifying_key(token)
+
+        if key is None:
+            raise ImproperlyConfigured(
+                'JWT_PUBLIC_KEY is required to verify tokens with {}'.format(
+                    self.algorithm))
+
+        return self.jwt.decode(
+            token,
+            key,
+            options=self.options,
+            leeway=self.leeway,
+            audience=self.audience,
+            issuer=self.issuer,
+            algorithms=self.algorithms)
+
+
+_codec = None
+
+
+def get_codec():
+    global _codec
+
+    if _codec is None:
+        _codec = JSONWebTokenCodec.from_settings()
+    return _codec
+
+
+def reset_codec(*args, **kwargs):
+    global _codec
+    _codec = None
+
+
+settings_reloaded.connect(reset_codec)
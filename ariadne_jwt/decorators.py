@@ -1,17 +1,31 @@
-from functools import wraps
+from functools import lru_cache, wraps
 
 import six
+from asgiref.sync import sync_to_async
 from django.contrib.auth import authenticate, get_user_model
+from django.utils.functional import SimpleLazyObject, empty
 from django.utils.translation import gettext as _
 from graphql import GraphQLResolveInfo
 
 from promise import Promise, is_thenable
 
 from . import exceptions
+from .login import get_login_executor
 from .settings import jwt_settings
-from .utils import get_authorization_header
+from .utils import (aget_user_permissions, get_authorization_header,
+                    get_user_permissions)
 from .refresh_token.shortcuts import create_refresh_token
 
+try:
+    from asgiref.sync import iscoroutinefunction
+except ImportError:  # asgiref < 3.6
+    from asyncio import iscoroutinefunction
+
+try:
+    from django.contrib.auth import aauthenticate
+except ImportError:  # Django < 5.0
+    aauthenticate = sync_to_async(authenticate)
+
 __all__ = [
     'user_passes_test',
     'login_required',
@@ -23,6 +37,14 @@ __all__ = [
 
 def context(f):
     def decorator(func):
+        if iscoroutinefunction(func):
+            async def wrapper(*args, **kwargs):
+                info = next(arg for arg in args
+                            if isinstance(arg, GraphQLResolveInfo))
+                return await func(info.context, *args, **kwargs)
+
+            return wrapper
+
         def wrapper(*args, **kwargs):
             info = next(arg for arg in args
                         if isinstance(arg, GraphQLResolveInfo))
@@ -33,72 +55,160 @@ def context(f):
     return decorator
 
 
+async def aget_request_user(request):
+    """Returns the request user without blocking the event loop"""
+    user = request.user
+
+    if isinstance(user, SimpleLazyObject) and user._wrapped is empty:
+        # JSONWebTokenMiddleware sets request.auser() along with a lazy user
+        if hasattr(request, 'auser'):
+            return await request.auser()
+        await sync_to_async(user._setup)()
+    return user
+
+
+async def apply_test(test_func, user):
+    async_test = getattr(test_func, 'async_test', test_func)
+
+    if iscoroutinefunction(async_test):
+        return await async_test(user)
+    return test_func(user)
+
+
 def user_passes_test(test_func):
     def decorator(f):
-        @wraps(f)
-        @context(f)
-        def wrapper(context, *args, **kwargs):
-            if test_func(context.get('request').user):
-                return f(*args, **kwargs)
-            raise exceptions.PermissionDenied()
-
+        if iscoroutinefunction(f):
+            @wraps(f)
+            @context(f)
+            async def wrapper(context, *args, **kwargs):
+                user = await aget_request_user(context.get('request'))
+
+                if await apply_test(test_func, user):
+                    return await f(*args, **kwargs)
+                raise exceptions.PermissionDenied()
+        else:
+            @wraps(f)
+            @context(f)
+            def wrapper(context, *args, **kwargs):
+                if test_func(context.get('request').user):
+                    return f(*args, **kwargs)
+                raise exceptions.PermissionDenied()
+
+        wrapper.jwt_tests = (test_func,) + getattr(f, 'jwt_tests', ())
         return wrapper
 
     return decorator
 
 
-login_required = user_passes_test(lambda u: u.is_authenticated)
-staff_member_required = user_passes_test(lambda u: u.is_active and u.is_staff)
+def is_authenticated(user):
+    return user.is_authenticated
 
 
-def permission_required(perm):
+def is_staff_member(user):
+    return user.is_active and user.is_staff
+
+
+@lru_cache(maxsize=None)
+def has_perms(perms):
     def check_perms(user):
-        if isinstance(perm, six.string_types):
-            perms = (perm,)
-        else:
-            perms = perm
+        if jwt_settings.JWT_PERMISSIONS_SNAPSHOT:
+            if user.is_active and user.is_superuser:
+                return True
+            return get_user_permissions(user).issuperset(perms)
 
         if user.has_perms(perms):
             return True
         return False
 
-    return user_passes_test(check_perms)
+    async def acheck_perms(user):
+        if jwt_settings.JWT_PERMISSIONS_SNAPSHOT:
+            if user.is_active and user.is_superuser:
+                return True
+            permissions = await aget_user_permissions(user)
+            return permissions.issuperset(perms)
 
+        if hasattr(type(user), 'ahas_perms'):  # Django >= 5.2
+            return await user.ahas_perms(perms)
+        return await sync_to_async(user.has_perms)(perms)
 
-def token_auth(f):
-    @wraps(f)
-    def wrapper(root, info, password, **kwargs):
-        def on_resolve(values):
-            user, payload = values
-            payload['payload'] = jwt_settings.JWT_PAYLOAD_HANDLER(user,
-                                                                  info.context)
-            payload['token'] = jwt_settings.JWT_ENCODE_HANDLER(
-                payload['payload'], info.context)
-            if jwt_settings.JWT_LONG_RUNNING_REFRESH_TOKEN:
-                payload['refresh_token'] = create_refresh_token(user).token
-            return payload
+    check_perms.async_test = acheck_perms
+    return check_perms
 
+
+login_required = user_passes_test(is_authenticated)
+staff_member_required = user_passes_test(is_staff_member)
+
+
+def permission_required(perm):
+    if isinstance(perm, six.string_types):
+        perms = (perm,)
+    else:
+        perms = tuple(perm)
+
+    return user_passes_test(has_perms(perms))
+
+
+def token_auth(f):
+    def on_resolve(values, context):
+        user, payload = values
+        payload['payload'] = jwt_settings.JWT_PAYLOAD_HANDLER(user, context)
+        payload['token'] = jwt_settings.JWT_ENCODE_HANDLER(
+            payload['payload'], context)
+        if jwt_settings.JWT_LONG_RUNNING_REFRESH_TOKEN:
+            payload['refresh_token'] = create_refresh_token(user).token
+        return payload
+
+    def get_credentials(info, password, kwargs):
+        request = info.context.get('request')
         username = kwargs.get(get_user_model().USERNAME_FIELD)
 
-        if get_authorization_header(info.context.get('request')) is not None:
-            del info.context.get('request').META[jwt_settings.JWT_AUTH_HEADER]
+        if get_authorization_header(request) is not None:
+            del request.META[jwt_settings.JWT_AUTH_HEADER]
 
-        user = authenticate(info.context.get('request'),
-                            username=username,
-                            password=password)
+        return request, {'username': username, 'password': password}
 
+    def login(request, user):
         if user is None:
             raise exceptions.JSONWebTokenError(
                 _('Please, enter valid credentials'))
 
-        if hasattr(info.context.get('request'), 'user'):
-            info.context.get('request').user = user
+        if hasattr(request, 'user'):
+            request.user = user
+
+    if iscoroutinefunction(f):
+        @wraps(f)
+        async def wrapper(root, info, password, **kwargs):
+            request, credentials = get_credentials(info, password, kwargs)
+
+            if jwt_settings.JWT_LOGIN_EXECUTOR:
+                user = await get_login_executor().aauthenticate(
+                    request, **credentials)
+            else:
+                user = await aauthenticate(request, **credentials)
+            login(request, user)
+
+            result = await f(root, info, **kwargs)
+            # Payload handlers and refresh tokens may query the database
+            return await sync_to_async(on_resolve)((user, result), info.context)
+
+        return wrapper
+
+    @wraps(f)
+    def wrapper(root, info, password, **kwargs):
+        request, credentials = get_credentials(info, password, kwargs)
+
+        if jwt_settings.JWT_LOGIN_EXECUTOR:
+            user = get_login_executor().authenticate(request, **credentials)
+        else:
+            user = authenticate(request, **credentials)
+        login(request, user)
 
         result = f(root, info, **kwargs)
         values = (user, result)
         # Improved mutation with thenable check
         if is_thenable(result):
-            return Promise.resolve(values).then(on_resolve)
-        return on_resolve(values)
+            return Promise.resolve(values).then(
+                lambda values: on_resolve(values, info.context))
+        return on_resolve(values, info.context)
 
     return wrapper
@@ -0,0 +1,81 @@
+from ariadne import SchemaDirectiveVisitor
+from graphql import default_field_resolver
+
+from . import exceptions
+from .decorators import (aget_request_user, apply_test, has_perms,
+                         is_authenticated, is_staff_member,
+                         iscoroutinefunction)
+
+__all__ = [
+    'LoginRequiredDirective',
+    'StaffRequiredDirective',
+    'HasPermDirective',
+    'jwt_directives',
+]
+
+
+def add_test(field, test):
+    """Adds a test to the requirements of the field, wrapping it only once"""
+    resolver = field.resolve
+
+    if hasattr(resolver, 'jwt_directive_tests'):
+        if test not in resolver.jwt_directive_tests:
+            resolver.jwt_directive_tests += (test,)
+            resolver.jwt_tests = (test,) + resolver.jwt_tests
+        return field
+
+    resolver = resolver or default_field_resolver
+
+    if iscoroutinefunction(resolver):
+        async def resolve(obj, info, **kwargs):
+            user = await aget_request_user(info.context.get('request'))
+
+            for test in resolve.jwt_directive_tests:
+                if not await apply_test(test, user):
+                    raise exceptions.PermissionDenied()
+            return await resolver(obj, info, **kwargs)
+    else:
+        def resolve(obj, info, **kwargs):
+            user = info.context.get('request').user
+
+            for test in resolve.jwt_directive_tests:
+                if not test(user):
+                    raise exceptions.PermissionDenied()
+            return resolver(obj, info, **kwargs)
+
+    resolve.jwt_directive_tests = (test,)
+    resolve.jwt_tests = (test,) + getattr(resolver, 'jwt_tests', ())
+    field.resolve = resolve
+    return field
+
+
+class JSONWebTokenDirective(SchemaDirectiveVisitor):
+    """Checks ``test_func`` against the request user before the field resolver"""
+    test_func = staticmethod(is_authenticated)
+
+    def get_test(self):
+        return self.test_func
+
+    def visit_field_definition(self, field, object_type):
+        return add_test(field, self.get_test())
+
+
+class LoginRequiredDirective(JSONWebTokenDirective):
+    test_func = staticmethod(is_authenticated)
+
+
+class StaffRequiredDirective(JSONWebTokenDirective):
+    test_func = staticmethod(is_staff_member)
+
+
+class HasPermDirective(JSONWebTokenDirective):
+
+    def get_test(self):
+        return has_perms(tuple(self.args['perms']))
+
+
+jwt_directives = {
+    'loginRequired': LoginRequiredDirective,
+    'staffRequired': StaffRequiredDirective,
+    'hasPerm': HasPermDirective,
+}
@@ -17,3 +17,7 @@ class PermissionDenied(JSONWebTokenError):
 
 class JSONWebTokenExpired(JSONWebTokenError):
     default_message = _('Signature has expired')
+
+
+class LoginUnavailable(JSONWebTokenError):
+    default_message = _('Too many login attempts, please try again later')
@@ -0,0 +1,165 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+
+from django.contrib.auth import authenticate
+from django.db import close_old_connections
+
+from . import exceptions
+from .settings import jwt_settings
+from .signals import settings_reloaded
+
+__all__ = [
+    'LoginExecutor',
+    'get_login_executor',
+]
+
+
+class LoginExecutor(object):
+    """Verifies credentials on a bounded pool of dedicated threads
+
+    At most ``max_workers`` verifications run at once and ``max_queue`` more
+    wait for a worker; further logins are rejected straight away. Logins still
+    waiting for a worker after ``timeout`` seconds are rejected without
+    verifying the credentials.
+    """
+
+    def __init__(self, max_workers, max_queue=0, timeout=None,
+                 timer=time.monotonic):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self.timer = timer
+        self.queued = 0
+        self.running = 0
+        self.completed = 0
+        self.rejected = 0
+        self.timeouts = 0
+        self.queue_time = 0
+        self.latency = 0
+        self.max_latency = 0
+        self._executor = ThreadPoolExecutor(
+            max_workers, thread_name_prefix='ariadne-jwt-login')
+        self._lock = threading.Lock()
+
+    def submit(self, request, **credentials):
+        with self._lock:
+            if self.queued + self.running >= self.max_workers + self.max_queue:
+                self.rejected += 1
+                raise exceptions.LoginUnavailable()
+            self.queued += 1
+
+        return self._executor.submit(
+            self.run, self.timer(), request, credentials)
+
+    def run(self, submitted, request, credentials):
+        started = self.timer()
+
+        with self._lock:
+            self.queued -= 1
+            self.queue_time += started - submitted
+
+            if self.timeout is not None and started - submitted > self.timeout:
+                self.timeouts += 1
+                raise exceptions.LoginUnavailable()
+            self.running += 1
+
+        close_old_connections()
+
+        try:
+            return authenticate(request, **credentials)
+        finally:
+            close_old_connections()
+            latency = self.timer() - submitted
+
+            with self._lock:
+                self.running -= 1
+                self.completed += 1
+                self.latency += latency
+                self.max_latency = max(self.max_latency, latency)
+
+    def cancel(self, future):
+        """Withdraws a login still waiting for a worker"""
+        if not future.cancel():
+            return False
+
+        with self._lock:
+            self.queued -= 1
+            self.timeouts += 1
+        return True
+
+    def authenticate(self, request, **credentials):
+        future = self.submit(request, **credentials)
+
+        try:
+            return future.result(timeout=self.timeout)
+        except TimeoutError:
+            if self.cancel(future):
+                raise exceptions.LoginUnavailable()
+        # Credentials being verified are waited for
+        return future.result()
+
+    async def aauthenticate(self, request, **credentials):
+        future = self.submit(request, **credentials)
+        result = asyncio.wrap_future(future)
+
+        try:
+            return await asyncio.wait_for(asyncio.shield(result), self.timeout)
+        except asyncio.TimeoutError:
+            if self.cancel(future):
+                raise exceptions.LoginUnavailable()
+        return await result
+
+    def stats(self):
+        with self._lock:
+            completed = self.completed or 1
+            dequeued = (self.completed + self.running + self.timeouts) or 1
+            return {
+                'max_workers': self.max_workers,
+                'max_queue': self.max_queue,
+                'queued': self.queued,
+                'running': self.running,
+                'completed': self.completed,
+                'rejected': self.rejected,
+                'timeouts': self.timeouts,
+                'avg_queue_time': self.queue_time / dequeued,
+                'avg_latency': self.latency / completed,
+                'max_latency': self.max_latency,
+            }
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_login_executor():
+    global _executor
+
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                timeout = jwt_settings.JWT_LOGIN_QUEUE_TIMEOUT
+
+                if timeout is not None:
+                    timeout = timeout.total_seconds()
+
+                _executor = LoginExecutor(
+                    max_workers=jwt_settings.JWT_LOGIN_MAX_WORKERS,
+                    max_queue=jwt_settings.JWT_LOGIN_MAX_QUEUE,
+                    timeout=timeout)
+    return _executor
+
+
+def reset_login_executor(*args, **kwargs):
+    global _executor
+
+    if _executor is not None:
+        _executor.shutdown(wait=False)
+        _executor = None
+
+
+settings_reloaded.connect(reset_login_executor)
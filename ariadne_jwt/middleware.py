@@ -1,29 +1,208 @@
+import django
+from asgiref.sync import sync_to_async
 from django.http import JsonResponse
 from django.contrib.auth import authenticate
+from django.contrib.auth.models import AnonymousUser
 from django.utils.cache import patch_vary_headers
+from django.utils.functional import SimpleLazyObject, empty
 
+from .backends import JSONWebTokenBackend
+from .decorators import aget_request_user
 from .exceptions import JSONWebTokenError
-from .utils import get_authorization_header
+from .settings import jwt_settings
+from .utils import get_authorization_header, get_renewed_token, needs_renewal
+
+try:
+    from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+except ImportError:  # asgiref < 3.6
+    import asyncio
+    from asyncio import iscoroutinefunction
+
+    def markcoroutinefunction(func):
+        func._is_coroutine = asyncio.coroutines._is_coroutine
+        return func
+
+backend = JSONWebTokenBackend()
+backend_path = '{}.{}'.format(
+    JSONWebTokenBackend.__module__,
+    JSONWebTokenBackend.__qualname__)
+
+if django.VERSION >= (5, 2):
+    from django.contrib.auth import aauthenticate
+else:
+    # Before Django 5.2 aauthenticate() runs authenticate() in a thread
+    # instead of awaiting the backends
+    aauthenticate = None
+
+
+def authenticate_request(request):
+    if not jwt_settings.JWT_DIRECT_AUTHENTICATION:
+        return authenticate(request=request)
+
+    user = backend.authenticate(request=request)
+
+    if user is not None:
+        user.backend = backend_path
+    return user
+
+
+async def aauthenticate_request(request):
+    if aauthenticate is not None and not jwt_settings.JWT_DIRECT_AUTHENTICATION:
+        return await aauthenticate(request=request)
+
+    user = await backend.aauthenticate(request=request)
+
+    if user is not None:
+        user.backend = backend_path
+    return user
+
+
+def get_user(request, user=None):
+    if user is not None and not user.is_anonymous:
+        return user
+
+    try:
+        jwt_user = authenticate_request(request)
+    except JSONWebTokenError:
+        jwt_user = None
+
+    if jwt_user is None:
+        return user if user is not None else AnonymousUser()
+
+    request._cached_user = jwt_user
+    return jwt_user
+
+
+async def aget_user(request, user=None, auser=None):
+    if auser is not None:
+        user = await auser()
+    elif isinstance(user, SimpleLazyObject) and user._wrapped is empty:
+        await sync_to_async(user._setup)()
+
+    if user is not None and not user.is_anonymous:
+        return user
+
+    try:
+        jwt_user = await aauthenticate_request(request)
+    except JSONWebTokenError:
+        jwt_user = None
+
+    if jwt_user is None:
+        return user if user is not None else AnonymousUser()
+
+    request._cached_user = request._acached_user = jwt_user
+    return jwt_user
+
+
+def compile_request_matcher(include_paths=None, exclude_paths=(),
+                            exclude_methods=()):
+    include_paths = tuple(include_paths) if include_paths is not None else None
+    exclude_paths = tuple(exclude_paths)
+    exclude_methods = frozenset(method.upper() for method in exclude_methods)
+
+    def matches(request):
+        if request.method in exclude_methods:
+            return False
+
+        path = request.path_info
+
+        if include_paths is not None and not path.startswith(include_paths):
+            return False
+        return not (exclude_paths and path.startswith(exclude_paths))
+
+    return matches
+
+
+async def is_anonymous(request):
+    user = await aget_request_user(request)
+    return user.is_anonymous
 
 
 class JSONWebTokenMiddleware(object):
+    sync_capable = True
+    async_capable = True
 
     def __init__(self, get_response):
         self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        self.matches = compile_request_matcher(
+            jwt_settings.JWT_MIDDLEWARE_INCLUDE_PATHS,
+            jwt_settings.JWT_MIDDLEWARE_EXCLUDE_PATHS,
+            jwt_settings.JWT_MIDDLEWARE_EXCLUDE_METHODS)
+
+        if self.async_mode:
+            markcoroutinefunction(self)
 
     def __call__(self, request):
+        if not self.matches(request):
+            return self.get_response(request)
+
+        if self.async_mode:
+            return self.__acall__(request)
+
         if get_authorization_header(request) is not None:
-            if not hasattr(request, 'user') or request.user.is_anonymous:
+            if jwt_settings.JWT_LAZY_AUTHENTICATION:
+                self.set_lazy_user(request)
+
+            elif not hasattr(request, 'user') or request.user.is_anonymous:
                 try:
-                    user = authenticate(request=request)
+                    user = authenticate_request(request)
                 except JSONWebTokenError as err:
-                    return JsonResponse({
-                        'errors': [{'message': str(err)}]
-                    }, status=401)
+                    return self.error_response(err)
 
                 if user is not None:
                     request.user = request._cached_user = user
 
         response = self.get_response(request)
         patch_vary_headers(response, ('Authorization',))
+
+        if jwt_settings.JWT_SLIDING_REFRESH and needs_renewal(request):
+            self.set_renewed_token(request, response)
         return response
+
+    async def __acall__(self, request):
+        if get_authorization_header(request) is not None:
+            if jwt_settings.JWT_LAZY_AUTHENTICATION:
+                self.set_lazy_user(request)
+
+            elif not hasattr(request, 'user') or await is_anonymous(request):
+                try:
+                    user = await aauthenticate_request(request)
+                except JSONWebTokenError as err:
+                    return self.error_response(err)
+
+                if user is not None:
+                    request.user = request._cached_user = user
+                    request._acached_user = user
+
+        response = await self.get_response(request)
+        patch_vary_headers(response, ('Authorization',))
+
+        if jwt_settings.JWT_SLIDING_REFRESH and needs_renewal(request):
+            await sync_to_async(self.set_renewed_token)(request, response)
+        return response
+
+    def set_lazy_user(self, request):
+        user = getattr(request, 'user', None)
+        auser = getattr(request, 'auser', None)
+        lazy_user = SimpleLazyObject(lambda: get_user(request, user))
+
+        async def aget_lazy_user():
+            if lazy_user._wrapped is empty:
+                lazy_user._wrapped = await aget_user(request, user, auser)
+            return lazy_user._wrapped
+
+        # Keep request.auser() in step with request.user, as Django does
+        request.user = lazy_user
+        request.auser = aget_lazy_user
+
+    def set_renewed_token(self, request, response):
+        token = get_renewed_token(request)
+
+        if token is not None:
+            response[jwt_settings.JWT_SLIDING_REFRESH_HEADER] = token
+
+    def error_response(self, error):
+        return JsonResponse({
+            'errors': [{'message': str(error)}]
+        }, status=401)
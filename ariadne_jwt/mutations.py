@@ -10,6 +10,10 @@ __all__ = ['resolve_verify', 'resolve_refresh', 'resolve_revoke', 'resolve_token
 
 jwt_schema = '''
     scalar GenericScalar
+
+    directive @loginRequired on FIELD_DEFINITION
+    directive @staffRequired on FIELD_DEFINITION
+    directive @hasPerm(perms: [String!]!) on FIELD_DEFINITION
     
     type VerifyToken {
         payload: GenericScalar
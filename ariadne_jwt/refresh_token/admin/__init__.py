@@ -8,12 +8,24 @@ from .. import models
 
 @admin.register(models.RefreshToken)
 class RefreshTokenAdmin(admin.ModelAdmin):
-    list_display = ['user', 'token', 'created', 'revoked', 'is_expired']
+    list_display = ['user', 'token_hash', 'created', 'revoked', 'is_expired']
     list_filter = (filters.RevokedFilter, filters.ExpiredFilter)
     raw_id_fields = ('user',)
-    search_fields = ('token',)
+    search_fields = ('=token_hash',)
     actions = ('revoke',)
 
+    def get_search_results(self, request, queryset, search_term):
+        search_term = search_term.strip()
+
+        if not search_term:
+            return queryset, False
+
+        # Tokens are stored hashed, search by the token or by its hash
+        return queryset.filter(token_hash__in=[
+            search_term,
+            queryset.model.hash_token(search_term),
+        ]), False
+
     def revoke(self, request, queryset):
         queryset.update(revoked=timezone.now())
 
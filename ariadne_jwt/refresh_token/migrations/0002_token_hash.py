@@ -0,0 +1,54 @@
+import hashlib
+
+from django.db import migrations, models
+
+
+def hash_tokens(apps, schema_editor):
+    RefreshToken = apps.get_model('refresh_token', 'RefreshToken')
+    queryset = RefreshToken.objects.using(schema_editor.connection.alias)
+    batch = []
+
+    for refresh_token in queryset.only('id', 'token').iterator():
+        refresh_token.token_hash = hashlib.sha256(
+            refresh_token.token.encode('utf-8')).hexdigest()
+        batch.append(refresh_token)
+
+        if len(batch) >= 1000:
+            queryset.bulk_update(batch, ['token_hash'])
+            batch = []
+
+    queryset.bulk_update(batch, ['token_hash'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('refresh_token', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='refreshtoken',
+            name='token_hash',
+            field=models.CharField(editable=False, max_length=64, null=True, verbose_name='token hash'),
+        ),
+        migrations.RunPython(hash_tokens, migrations.RunPython.noop),
+        migrations.AlterUniqueTogether(
+            name='refreshtoken',
+            unique_together=set(),
+        ),
+        migrations.RemoveField(
+            model_name='refreshtoken',
+            name='token',
+        ),
+        migrations.AlterField(
+            model_name='refreshtoken',
+            name='token_hash',
+            field=models.CharField(editable=False, max_length=64, unique=True, verbose_name='token hash'),
+        ),
+        migrations.AddIndex(
+            model_name='refreshtoken',
+            index=models.Index(condition=models.Q(revoked__isnull=True), fields=['token_hash'],
+                               name='refreshtoken_active_idx'),
+        ),
+    ]
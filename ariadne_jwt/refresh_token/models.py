@@ -1,9 +1,11 @@
 import binascii
+import hashlib
 import os
 from calendar import timegm
 
 from django.conf import settings
 from django.db import models
+from django.db.models import Q
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
@@ -21,7 +23,11 @@ class AbstractRefreshToken(models.Model):
         related_name='refresh_token',
         verbose_name=_('user'))
 
-    token = models.CharField(_('token'), max_length=255, editable=False)
+    token_hash = models.CharField(
+        _('token hash'),
+        max_length=64,
+        unique=True,
+        editable=False)
 
     created = models.DateTimeField(_('created'), auto_now_add=True)
     revoked = models.DateTimeField(_('revoked'), null=True, blank=True)
@@ -32,16 +38,29 @@ class AbstractRefreshToken(models.Model):
         abstract = True
         verbose_name = _('Refresh token')
         verbose_name_plural = _('Refresh tokens')
-        unique_together = ('token', 'revoked')
+        indexes = [
+            models.Index(
+                fields=['token_hash'],
+                condition=Q(revoked__isnull=True),
+                name='%(class)s_active_idx'),
+        ]
+
+    # The raw token is only known by the instance that generated it
+    token = None
 
     def __str__(self):
-        return self.token
+        return self.token or self.token_hash
 
     def save(self, *args, **kwargs):
-        if not self.token:
+        if not self.token_hash:
             self.token = self.generate_token()
+            self.token_hash = self.hash_token(self.token)
         return super(AbstractRefreshToken, self).save(*args, **kwargs)
 
+    @staticmethod
+    def hash_token(token):
+        return hashlib.sha256(str(token).encode('utf-8')).hexdigest()
+
     def generate_token(self):
         return binascii.hexlify(
             os.urandom(jwt_settings.JWT_REFRESH_TOKEN_N_BYTES),
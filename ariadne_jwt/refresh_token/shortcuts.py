@@ -13,7 +13,9 @@ def get_refresh_token(token):
     RefreshToken = get_refresh_token_model()
 
     try:
-        return RefreshToken.objects.get(token=token, revoked__isnull=True)
+        return RefreshToken.objects.get(
+            token_hash=RefreshToken.hash_token(token),
+            revoked__isnull=True)
     except RefreshToken.DoesNotExist:
         raise JSONWebTokenError(_('Invalid refresh token'))
 
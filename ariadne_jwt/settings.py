@@ -6,12 +6,19 @@ from django.contrib.auth import get_user_model
 from django.test.signals import setting_changed
 import six
 
+from .signals import settings_reloaded
+
 DEFAULTS = {
     'JWT_ALGORITHM': 'HS256',
     'JWT_AUDIENCE': None,
     'JWT_ISSUER': None,
     'JWT_LEEWAY': 0,
     'JWT_SECRET_KEY': settings.SECRET_KEY,
+    'JWT_PRIVATE_KEY': None,
+    'JWT_PUBLIC_KEY': None,
+    'JWT_KEYRING': None,
+    'JWT_KEY_ID': None,
+    'JWT_KEYRING_DEFAULT_KEY': False,
     'JWT_VERIFY': True,
     'JWT_VERIFY_EXPIRATION': False,
     'JWT_EXPIRATION_DELTA': timedelta(seconds=60 * 5),
@@ -27,6 +34,40 @@ DEFAULTS = {
     'JWT_PAYLOAD_HANDLER': 'ariadne_jwt.utils.jwt_payload',
     'JWT_PAYLOAD_GET_USERNAME_HANDLER': (lambda payload: payload.get(get_user_model().USERNAME_FIELD)),
     'JWT_REFRESH_EXPIRED_HANDLER': 'ariadne_jwt.utils.refresh_has_expired',
+    'JWT_USER_PK_CLAIM': None,
+    'JWT_USER_QUERYSET_HANDLER': 'ariadne_jwt.utils.get_user_queryset',
+    'JWT_CLAIMS_USER': False,
+    'JWT_LAZY_AUTHENTICATION': False,
+    'JWT_DIRECT_AUTHENTICATION': False,
+    'JWT_PERMISSIONS_SNAPSHOT': False,
+    'JWT_JSON_CODEC': 'json',
+    'JWT_COMPACT_CLAIMS': False,
+    'JWT_SLIDING_REFRESH': False,
+    'JWT_SLIDING_REFRESH_THRESHOLD': timedelta(seconds=60),
+    'JWT_SLIDING_REFRESH_HEADER': 'X-Refreshed-Token',
+    'JWT_LOGIN_EXECUTOR': False,
+    'JWT_LOGIN_MAX_WORKERS': 4,
+    'JWT_LOGIN_MAX_QUEUE': 16,
+    'JWT_LOGIN_QUEUE_TIMEOUT': timedelta(seconds=5),
+    'JWT_OPERATION_CACHE_MAX_SIZE': 256,
+    'JWT_MIDDLEWARE_INCLUDE_PATHS': None,
+    'JWT_MIDDLEWARE_EXCLUDE_PATHS': (),
+    'JWT_MIDDLEWARE_EXCLUDE_METHODS': (),
+    'JWT_CLAIMS_USER_CLASS': 'ariadne_jwt.claims.ClaimsUser',
+    'JWT_TOKEN_CACHE': False,
+    'JWT_TOKEN_CACHE_MAX_SIZE': 1024,
+    'JWT_REJECTED_TOKEN_CACHE': False,
+    'JWT_REJECTED_TOKEN_CACHE_MAX_SIZE': 1024,
+    'JWT_REJECTED_TOKEN_CACHE_TTL': timedelta(seconds=30),
+    'JWT_TOKEN_PRECHECK': False,
+    'JWT_TOKEN_MAX_LENGTH': 8192,
+    'JWT_BATCH_EXECUTOR': None,
+    'JWT_BATCH_MAX_WORKERS': None,
+    'JWT_USER_CACHE': False,
+    'JWT_USER_CACHE_ALIAS': None,
+    'JWT_USER_CACHE_MAX_SIZE': 1024,
+    'JWT_USER_CACHE_TIMEOUT': timedelta(seconds=60),
+    'JWT_USER_CACHE_MISSING_TIMEOUT': timedelta(seconds=5),
 }
 
 IMPORT_STRINGS = (
@@ -35,6 +76,8 @@ IMPORT_STRINGS = (
     'JWT_PAYLOAD_HANDLER',
     'JWT_PAYLOAD_GET_USERNAME_HANDLER',
     'JWT_REFRESH_EXPIRED_HANDLER',
+    'JWT_USER_QUERYSET_HANDLER',
+    'JWT_CLAIMS_USER_CLASS',
 )
 
 
@@ -90,6 +133,8 @@ class JWTSettings(object):
         if hasattr(self, '_user_settings'):
             delattr(self, '_user_settings')
 
+        settings_reloaded.send(sender=self.__class__)
+
 
 def reload_settings(*args, **kwargs):
     setting = kwargs['setting']
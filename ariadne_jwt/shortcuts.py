@@ -1,10 +1,15 @@
+from .codec import get_codec
 from .settings import jwt_settings
-from .utils import get_payload, get_user_by_payload
+from .utils import (compact_payload, get_authorization_header, get_payload,
+                    get_shared_claims, get_user_by_payload, jwt_encode,
+                    jwt_payload, set_request_payload)
 from .refresh_token.shortcuts import create_refresh_token, get_refresh_token
 
 __all__ = [
     'get_token',
+    'get_tokens',
     'get_user_by_token',
+    'get_request_payload',
     'get_refresh_token',
     'create_refresh_token',
 ]
@@ -16,6 +21,58 @@ def get_token(user, context=None, **extra):
     return jwt_settings.JWT_ENCODE_HANDLER(payload, context)
 
 
+def get_tokens(users, context=None, **extra):
+    """Yields a ``(user, token)`` pair for each user, as they are consumed
+
+    The claims that don't depend on the user are computed once per batch and
+    the default encode handler signs with a prepared signer.
+    """
+    payload_handler = jwt_settings.JWT_PAYLOAD_HANDLER
+    encode_handler = jwt_settings.JWT_ENCODE_HANDLER
+
+    if payload_handler is jwt_payload:
+        claims = get_shared_claims()
+
+        def make_payload(user):
+            return jwt_payload(user, context, claims)
+    else:
+        def make_payload(user):
+            return payload_handler(user, context)
+
+    if encode_handler is jwt_encode:
+        signer = get_codec().get_signer()
+
+        if jwt_settings.JWT_COMPACT_CLAIMS:
+            def sign(payload):
+                return signer(compact_payload(payload))
+        else:
+            sign = signer
+    else:
+        def sign(payload):
+            return encode_handler(payload, context)
+
+    for user in users:
+        payload = make_payload(user)
+        payload.update(extra)
+        yield user, sign(payload)
+
+
 def get_user_by_token(token, context=None):
     payload = get_payload(token, context)
     return get_user_by_payload(payload)
+
+
+def get_request_payload(info):
+    request = info.context.get('request')
+
+    if hasattr(request, 'jwt_payload'):
+        return request.jwt_payload
+
+    token = get_authorization_header(request)
+
+    if token is None:
+        return None
+
+    payload = get_payload(token, info.context)
+    set_request_payload(request, token, payload)
+    return payload
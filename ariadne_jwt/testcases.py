@@ -1,4 +1,5 @@
 from django.contrib.auth import authenticate
+from django.contrib.auth.models import AnonymousUser
 from django.core.handlers.wsgi import WSGIRequest
 from django.test import Client, RequestFactory, testcases
 
@@ -32,7 +33,7 @@ class JSONWebTokenClient(SchemaRequestFactory, Client):
 
     def request(self, **request):
         request = WSGIRequest(self._base_environ(**request))
-        request.user = authenticate(request)
+        request.user = authenticate(request) or AnonymousUser()
         return request
 
     def credentials(self, **kwargs):
@@ -1,63 +1,151 @@
+import json
+import re
+import threading
+
+from asgiref.sync import sync_to_async
+
 import jwt
+from jwt.utils import base64url_decode
 
 from calendar import timegm
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime
+from functools import lru_cache, partial
 
 from django.contrib.auth import get_user_model
+from django.db.models import Q
 from django.utils.translation import gettext as _
 
+from .cache import (cache_payload, cache_rejection, cache_user,
+                    get_cached_payload, get_cached_rejection, get_cached_user)
+from .codec import get_codec, is_symmetric
 from .settings import jwt_settings
+from .signals import settings_reloaded
 from . import exceptions
 
 
-def jwt_payload(user, context=None):
+def jwt_payload(user, context=None, claims=None):
     username = user.get_username()
 
     if hasattr(username, 'pk'):
         username = username.pk
 
-    payload = {
-        user.USERNAME_FIELD: username,
-        'exp': timegm((datetime.utcnow() + jwt_settings.JWT_EXPIRATION_DELTA)
-                      .utctimetuple())
+    payload = {user.USERNAME_FIELD: username}
+
+    if jwt_settings.JWT_USER_PK_CLAIM is not None:
+        pk = user.pk
+        payload[jwt_settings.JWT_USER_PK_CLAIM] = pk if isinstance(pk, int) else str(pk)
+
+    if jwt_settings.JWT_CLAIMS_USER:
+        payload['isStaff'] = user.is_staff
+        payload['isSuperuser'] = user.is_superuser
+
+        if hasattr(user, 'groups'):
+            payload['groups'] = list(user.groups.values_list('name', flat=True))
+
+    payload.update(get_shared_claims() if claims is None else claims)
+    return payload
+
+
+def get_shared_claims():
+    """Returns the claims that don't depend on the user"""
+    now = datetime.utcnow()
+    claims = {
+        'exp': timegm((now + jwt_settings.JWT_EXPIRATION_DELTA).utctimetuple()),
     }
 
     if jwt_settings.JWT_ALLOW_REFRESH:
-        payload['origIat'] = timegm(datetime.utcnow().utctimetuple())
+        claims['origIat'] = timegm(now.utctimetuple())
 
     if jwt_settings.JWT_AUDIENCE is not None:
-        payload['aud'] = jwt_settings.JWT_AUDIENCE
+        claims['aud'] = jwt_settings.JWT_AUDIENCE
 
     if jwt_settings.JWT_ISSUER is not None:
-        payload['iss'] = jwt_settings.JWT_ISSUER
+        claims['iss'] = jwt_settings.JWT_ISSUER
 
-    return payload
+    return claims
 
 
-def jwt_encode(payload, context=None):
-    token = jwt.encode(
-        payload,
-        jwt_settings.JWT_SECRET_KEY,
-        jwt_settings.JWT_ALGORITHM
-    )
+COMPACT_CLAIMS = {
+    'origIat': 'oi',
+    'isStaff': 'st',
+    'isSuperuser': 'su',
+    'groups': 'gr',
+}
 
-    # As of v2.0.0, PyJWT tokens are returned as string instead of a byte string
-    if isinstance(token, bytes):
-        return token.decode('utf-8')
-    return token
+COMPACT_USERNAME_CLAIM = 'u'
+COMPACT_PK_CLAIM = 'uid'
+
+
+def get_compact_claims():
+    claims = dict(COMPACT_CLAIMS)
+    claims[get_user_model().USERNAME_FIELD] = COMPACT_USERNAME_CLAIM
+
+    if jwt_settings.JWT_USER_PK_CLAIM is not None:
+        claims[jwt_settings.JWT_USER_PK_CLAIM] = COMPACT_PK_CLAIM
+    return claims
+
+
+def compact_payload(payload):
+    """Renames the claims with their compact names
+
+    The username is left out when the payload carries a numeric primary key.
+    """
+    claims = get_compact_claims()
+    pk_claim = jwt_settings.JWT_USER_PK_CLAIM
+    skip = None
+
+    if pk_claim is not None and isinstance(payload.get(pk_claim), int):
+        skip = get_user_model().USERNAME_FIELD
+
+    return rename_claims(
+        {name: value for name, value in payload.items() if name != skip},
+        claims)
+
+
+def rename_claims(payload, claims):
+    """Renames the claims of the payload, never overwriting a present claim"""
+    renamed = {}
+
+    for name, value in payload.items():
+        new_name = claims.get(name, name)
+
+        if new_name != name and new_name in payload:
+            new_name = name
+        renamed[new_name] = value
+    return renamed
+
+
+def is_compact_payload(payload):
+    """Whether the payload identifies the user with compact claims only"""
+    if (COMPACT_USERNAME_CLAIM not in payload and
+            COMPACT_PK_CLAIM not in payload):
+        return False
+
+    pk_claim = jwt_settings.JWT_USER_PK_CLAIM
+
+    return (get_user_model().USERNAME_FIELD not in payload and
+            (pk_claim is None or pk_claim not in payload))
+
+
+def expand_payload(payload):
+    """Renames compact claims back, payloads in the long format are returned as is"""
+    if not is_compact_payload(payload):
+        return payload
+
+    claims = {compact: name for name, compact in get_compact_claims().items()}
+    return rename_claims(payload, claims)
+
+
+def jwt_encode(payload, context=None):
+    if jwt_settings.JWT_COMPACT_CLAIMS:
+        payload = compact_payload(payload)
+    return get_codec().encode(payload)
 
 
 def jwt_decode(token, context=None):
-    return jwt.decode(
-        token,
-        jwt_settings.JWT_SECRET_KEY,
-        options={
-            'verify_exp': jwt_settings.JWT_VERIFY_EXPIRATION
-        },
-        leeway=jwt_settings.JWT_LEEWAY,
-        audience=jwt_settings.JWT_AUDIENCE,
-        issuer=jwt_settings.JWT_ISSUER,
-        algorithms=[jwt_settings.JWT_ALGORITHM])
+    return get_codec().decode(token)
 
 
 def get_authorization_header(request):
@@ -69,39 +157,387 @@ def get_authorization_header(request):
     return auth[1]
 
 
-def get_payload(token, context=None):
+TOKEN_RE = re.compile(r'([\w-]+)\.[\w-]+\.[\w-]+', re.ASCII)
+
+precheck_stats = Counter()
+_precheck_stats_lock = threading.Lock()
+
+
+def count_precheck(reason):
+    # Tokens may be checked concurrently by the get_payloads() thread pool
+    with _precheck_stats_lock:
+        precheck_stats[reason] += 1
+
+
+@lru_cache(maxsize=128)
+def get_header_algorithm(header_segment):
     try:
-        payload = jwt_settings.JWT_DECODE_HANDLER(token, context)
+        header = json.loads(base64url_decode(header_segment.encode('ascii')))
+    except (TypeError, ValueError):
+        return None
+
+    if isinstance(header, dict):
+        return header.get('alg')
+    return None
+
+
+def check_token_structure(token):
+    if isinstance(token, bytes):
+        token = token.decode('latin-1')
+
+    if len(token) > jwt_settings.JWT_TOKEN_MAX_LENGTH:
+        count_precheck('length')
+        raise jwt.DecodeError('Token is too long')
+
+    match = TOKEN_RE.fullmatch(token)
+
+    if match is None:
+        count_precheck('format')
+        raise jwt.DecodeError('Invalid token format')
+
+    if get_header_algorithm(match.group(1)) != jwt_settings.JWT_ALGORITHM:
+        count_precheck('algorithm')
+        raise jwt.InvalidAlgorithmError('The specified alg value is not allowed')
+
+    count_precheck('passed')
+
+
+def get_context_request(context):
+    if hasattr(context, 'get'):
+        return context.get('request')
+    return None
+
+
+def set_request_payload(request, token, payload):
+    request.jwt_token = token
+    request.jwt_payload = payload
+
+
+def get_known_payload(token, request=None):
+    """Returns the payload of a token verified before, None otherwise
+
+    The error of a token rejected before is raised again.
+    """
+    if request is not None and getattr(request, 'jwt_token', None) == token:
+        return request.jwt_payload
+
+    if jwt_settings.JWT_TOKEN_CACHE:
+        payload = get_cached_payload(token)
+
+        if payload is not None:
+            return payload
+
+    if jwt_settings.JWT_REJECTED_TOKEN_CACHE:
+        error = get_cached_rejection(token)
+
+        if error is not None:
+            raise error
+    return None
+
+
+def decode_token(token, context=None):
+    try:
+        if jwt_settings.JWT_TOKEN_PRECHECK:
+            check_token_structure(token)
+
+        return expand_payload(
+            jwt_settings.JWT_DECODE_HANDLER(token, context))
     except jwt.ExpiredSignatureError:
-        raise exceptions.JSONWebTokenExpired()
+        error = exceptions.JSONWebTokenExpired()
     except jwt.DecodeError:
-        raise exceptions.JSONWebTokenError(_('Error decoding signature'))
+        error = exceptions.JSONWebTokenError(_('Error decoding signature'))
     except jwt.InvalidTokenError:
-        raise exceptions.JSONWebTokenError(_('Invalid token'))
+        error = exceptions.JSONWebTokenError(_('Invalid token'))
+    raise error
+
+
+def decode_token_or_error(token):
+    try:
+        return decode_token(token)
+    except exceptions.JSONWebTokenError as err:
+        return err
+
+
+def remember_token(token, result):
+    if isinstance(result, exceptions.JSONWebTokenError):
+        if jwt_settings.JWT_REJECTED_TOKEN_CACHE:
+            cache_rejection(token, result)
+
+    elif jwt_settings.JWT_TOKEN_CACHE:
+        cache_payload(token, result)
+
+
+def get_payload(token, context=None):
+    payload = get_known_payload(token, get_context_request(context))
+
+    if payload is not None:
+        return payload
+
+    try:
+        payload = decode_token(token, context)
+    except exceptions.JSONWebTokenError as err:
+        remember_token(token, err)
+        raise
+
+    remember_token(token, payload)
     return payload
 
 
-def get_user_by_natural_key(user_id):
+def get_payload_or_error(token, context=None):
+    try:
+        return get_payload(token, context)
+    except exceptions.JSONWebTokenError as err:
+        return err
+
+
+BATCH_EXECUTORS = {
+    'thread': ThreadPoolExecutor,
+    'process': ProcessPoolExecutor,
+}
+
+_batch_executor = None
+_batch_executor_lock = threading.Lock()
+
+
+def get_batch_executor():
+    global _batch_executor
+
+    if _batch_executor is None:
+        with _batch_executor_lock:
+            if _batch_executor is None:
+                executor_class = BATCH_EXECUTORS[jwt_settings.JWT_BATCH_EXECUTOR]
+                _batch_executor = executor_class(
+                    jwt_settings.JWT_BATCH_MAX_WORKERS)
+    return _batch_executor
+
+
+def reset_batch_executor(*args, **kwargs):
+    global _batch_executor
+
+    if _batch_executor is not None:
+        _batch_executor.shutdown(wait=False)
+        _batch_executor = None
+
+
+settings_reloaded.connect(reset_batch_executor)
+
+
+def get_payloads(tokens, context=None):
+    tokens = list(tokens)
+    unique_tokens = list(dict.fromkeys(tokens))
+
+    if (jwt_settings.JWT_BATCH_EXECUTOR not in BATCH_EXECUTORS or
+            len(unique_tokens) < 2 or
+            is_symmetric(jwt_settings.JWT_ALGORITHM)):
+        results = [get_payload_or_error(token, context)
+                   for token in unique_tokens]
+    else:
+        executor = get_batch_executor()
+
+        if isinstance(executor, ProcessPoolExecutor):
+            results = get_payloads_in_processes(
+                executor, unique_tokens, context)
+        else:
+            verify = partial(get_payload_or_error, context=context)
+            results = list(executor.map(verify, unique_tokens))
+
+    results = dict(zip(unique_tokens, results))
+    return [results[token] for token in tokens]
+
+
+def get_payloads_in_processes(executor, tokens, context=None):
+    """Decodes the unknown tokens in worker processes
+
+    The request and the caches are checked and updated by the calling
+    process, but the decode handler receives no context since the request
+    can't be pickled.
+    """
+    request = get_context_request(context)
+    results = {}
+    pending = []
+
+    for token in tokens:
+        try:
+            payload = get_known_payload(token, request)
+        except exceptions.JSONWebTokenError as err:
+            payload = err
+
+        if payload is None:
+            pending.append(token)
+        else:
+            results[token] = payload
+
+    for token, result in zip(
+            pending, executor.map(decode_token_or_error, pending)):
+        remember_token(token, result)
+        results[token] = result
+
+    return [results[token] for token in tokens]
+
+
+def get_cached_user_or_lookup(kind, value, lookup):
+    if jwt_settings.JWT_USER_CACHE:
+        user = get_cached_user(kind, value)
+
+        if user is not None:
+            return user or None
+
     User = get_user_model()
     try:
-        return User.objects.get_by_natural_key(user_id)
+        user = lookup(value)
     except User.DoesNotExist:
-        return None
+        user = None
+
+    if jwt_settings.JWT_USER_CACHE:
+        cache_user(kind, value, user)
+    return user
+
+
+def get_user_by_natural_key(user_id):
+    return get_cached_user_or_lookup(
+        'username', user_id, get_user_model().objects.get_by_natural_key)
+
+
+def get_user_queryset():
+    return get_user_model()._default_manager.all()
+
+
+def get_user_by_pk(pk):
+    return get_cached_user_or_lookup(
+        'pk', pk, lambda pk: jwt_settings.JWT_USER_QUERYSET_HANDLER().get(pk=pk))
 
 
 def get_user_by_payload(payload):
-    username = jwt_settings.JWT_PAYLOAD_GET_USERNAME_HANDLER(payload)
+    payload = expand_payload(payload)
+    pk_claim = jwt_settings.JWT_USER_PK_CLAIM
+
+    if pk_claim is not None and payload.get(pk_claim) is not None:
+        user = get_user_by_pk(payload[pk_claim])
+    else:
+        username = jwt_settings.JWT_PAYLOAD_GET_USERNAME_HANDLER(payload)
 
-    if not username:
-        raise exceptions.JSONWebTokenError(_('Invalid payload'))
+        if not username:
+            raise exceptions.JSONWebTokenError(_('Invalid payload'))
 
-    user = get_user_by_natural_key(username)
+        user = get_user_by_natural_key(username)
 
     if user is not None and not user.is_active:
         raise exceptions.JSONWebTokenError(_('User is disabled'))
     return user
 
 
+def get_permissions_queryset(user):
+    from django.contrib.auth.models import Permission
+
+    return (Permission.objects
+            .filter(Q(user=user.pk) | Q(group__user=user.pk))
+            .values_list('content_type__app_label', 'codename')
+            .distinct())
+
+
+def get_user_permissions(user):
+    permissions = getattr(user, '_jwt_permissions', None)
+
+    if permissions is not None:
+        return permissions
+
+    owner = user
+
+    if user.pk is None and hasattr(user, 'get_user'):
+        # Claims users without the pk claim
+        owner = user.get_user()
+
+    if not user.is_active or owner is None or owner.pk is None:
+        permissions = frozenset()
+    else:
+        permissions = frozenset(
+            '{}.{}'.format(app_label, codename)
+            for app_label, codename in get_permissions_queryset(owner))
+
+    user._jwt_permissions = permissions
+    return permissions
+
+
+async def aget_user_permissions(user):
+    permissions = getattr(user, '_jwt_permissions', None)
+
+    if permissions is not None:
+        return permissions
+
+    owner = user
+
+    if user.pk is None and hasattr(user, 'get_user'):
+        owner = await sync_to_async(user.get_user)()
+
+    if not user.is_active or owner is None or owner.pk is None:
+        permissions = frozenset()
+    else:
+        permissions = frozenset([
+            '{}.{}'.format(app_label, codename)
+            async for app_label, codename in get_permissions_queryset(owner)])
+
+    user._jwt_permissions = permissions
+    return permissions
+
+
 def refresh_has_expired(orig_iat, context=None):
     return (timegm(datetime.utcnow().utctimetuple()) >
             orig_iat + jwt_settings.JWT_REFRESH_EXPIRATION_DELTA.total_seconds())
+
+
+def needs_renewal(request):
+    """Whether the verified token of the request expires soon"""
+    payload = getattr(request, 'jwt_payload', None)
+
+    if payload is None or not payload.get('origIat'):
+        return False
+
+    exp = payload.get('exp')
+
+    if not isinstance(exp, (int, float)):
+        return False
+
+    threshold = jwt_settings.JWT_SLIDING_REFRESH_THRESHOLD.total_seconds()
+    return exp - timegm(datetime.utcnow().utctimetuple()) <= threshold
+
+
+def get_renewed_token(request):
+    """Returns a new token for the request user, keeping ``origIat``
+
+    The user is loaded again so the new token reflects its current state, and
+    disabled or deleted users get no token.
+    """
+    payload = request.jwt_payload
+    user = getattr(request, 'user', None)
+    context = {'request': request}
+
+    if user is None or not user.is_authenticated:
+        return None
+
+    pk_claim = jwt_settings.JWT_USER_PK_CLAIM
+
+    if pk_claim is not None and payload.get(pk_claim) is not None:
+        if str(payload[pk_claim]) != str(user.pk):
+            return None
+
+    elif (jwt_settings.JWT_PAYLOAD_GET_USERNAME_HANDLER(payload) !=
+            user.get_username()):
+        return None
+
+    orig_iat = payload['origIat']
+
+    if jwt_settings.JWT_REFRESH_EXPIRED_HANDLER(orig_iat, context):
+        return None
+
+    # Claims users carry the privileges of the presented token
+    try:
+        user = get_user_by_payload(payload)
+    except exceptions.JSONWebTokenError:
+        return None
+
+    if user is None:
+        return None
+
+    new_payload = jwt_settings.JWT_PAYLOAD_HANDLER(user, context)
+    new_payload['origIat'] = orig_iat
+    return jwt_settings.JWT_ENCODE_HANDLER(new_payload, context)
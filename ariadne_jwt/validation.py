@@ -0,0 +1,173 @@
+import asyncio
+import hashlib
+import weakref
+from functools import partial
+
+from django.contrib.auth.models import AnonymousUser
+from django.utils.functional import SimpleLazyObject, empty
+from graphql import GraphQLError
+from graphql.language import BREAK, SKIP
+from graphql.validation import ValidationRule
+
+from . import exceptions
+from .cache import LRUCache
+from .settings import jwt_settings
+from .signals import settings_reloaded
+
+__all__ = [
+    'OperationAuthorizationRule',
+    'jwt_validation_rules',
+]
+
+_operation_caches = weakref.WeakKeyDictionary()
+
+
+def get_operation_cache(schema):
+    cache = _operation_caches.get(schema)
+
+    if cache is None:
+        cache = _operation_caches.setdefault(
+            schema, LRUCache(jwt_settings.JWT_OPERATION_CACHE_MAX_SIZE))
+    return cache
+
+
+def clear_operation_caches(*args, **kwargs):
+    _operation_caches.clear()
+
+
+settings_reloaded.connect(clear_operation_caches)
+
+
+def operation_key(query, operation_name):
+    digest = hashlib.sha256(query.encode('utf-8')).digest()
+    return (digest, operation_name)
+
+
+def in_async_context():
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
+
+
+def is_conditional(node):
+    return any(directive.name.value in ('skip', 'include')
+               for directive in node.directives or ())
+
+
+class Definition(object):
+    __slots__ = ('tests', 'spreads')
+
+    def __init__(self):
+        self.tests = {}
+        self.spreads = set()
+
+
+class OperationAuthorizationRule(ValidationRule):
+    """Checks the requirements of the executed operation before execution
+
+    The tests attached by the decorators and directives to the resolvers of
+    the operation fields are collected once per document and operation name.
+    Fields under a ``@skip`` or ``@include`` directive are left to their
+    resolvers, as are the tests that query the database when validation runs
+    on an event loop.
+    """
+
+    def __init__(self, context, user=None, key=None, is_async=False):
+        super(OperationAuthorizationRule, self).__init__(context)
+        self.user = user
+        self.key = key
+        self.is_async = is_async
+        self.operations = {}
+        self.fragments = {}
+        self.current = None
+
+    def enter_document(self, node, *args):
+        tests = get_operation_cache(self.context.schema).get(self.key)
+
+        if tests is not None:
+            self.check(tests, node)
+            return BREAK
+        return None
+
+    def enter_operation_definition(self, node, *args):
+        name = node.name.value if node.name else None
+        self.current = self.operations[name] = Definition()
+
+    def enter_fragment_definition(self, node, *args):
+        self.current = self.fragments[node.name.value] = Definition()
+
+    def enter_field(self, node, *args):
+        if is_conditional(node):
+            return SKIP
+
+        field = self.context.get_field_def()
+
+        if field is not None:
+            for test in getattr(field.resolve, 'jwt_tests', ()):
+                self.current.tests.setdefault(test, None)
+        return None
+
+    def enter_inline_fragment(self, node, *args):
+        if is_conditional(node):
+            return SKIP
+        return None
+
+    def enter_fragment_spread(self, node, *args):
+        if not is_conditional(node):
+            self.current.spreads.add(node.name.value)
+
+    def leave_document(self, node, *args):
+        _, operation_name = self.key
+
+        if operation_name is None and len(self.operations) == 1:
+            operation = next(iter(self.operations.values()))
+        else:
+            operation = self.operations.get(operation_name)
+
+        if operation is None:
+            return
+
+        tests = dict(operation.tests)
+        visited = set()
+        spreads = list(operation.spreads)
+
+        while spreads:
+            name = spreads.pop()
+
+            if name in visited or name not in self.fragments:
+                continue
+
+            visited.add(name)
+            fragment = self.fragments[name]
+            tests.update(dict.fromkeys(fragment.tests))
+            spreads.extend(fragment.spreads)
+
+        tests = tuple(tests)
+        get_operation_cache(self.context.schema).set(self.key, tests)
+        self.check(tests, node)
+
+    def check(self, tests, node):
+        if self.is_async:
+            user = self.user
+
+            # Loading a lazy user may query the database
+            if isinstance(user, SimpleLazyObject) and user._wrapped is empty:
+                return
+
+            # Tests with an async variant query the database
+            tests = [test for test in tests if not hasattr(test, 'async_test')]
+
+        for test in tests:
+            if not test(self.user):
+                self.report_error(GraphQLError(
+                    str(exceptions.PermissionDenied.default_message), node))
+                return
+
+
+def jwt_validation_rules(context, document, data):
+    user = getattr(context.get('request'), 'user', AnonymousUser())
+    key = operation_key(data.get('query') or '', data.get('operationName'))
+    return [partial(OperationAuthorizationRule, user=user, key=key,
+                    is_async=in_async_context())]
@@ -0,0 +1,75 @@
+"""Compares the JSON codecs of JWT_JSON_CODEC on payloads of growing size
+
+    python benchmarks/json_codec.py
+"""
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import django  # noqa: E402
+from django.conf import settings  # noqa: E402
+
+settings.configure(
+    SECRET_KEY='benchmark',
+    INSTALLED_APPS=['django.contrib.auth', 'django.contrib.contenttypes'],
+)
+django.setup()
+
+from ariadne_jwt.codec import JSONWebTokenCodec  # noqa: E402
+
+PAYLOADS = {
+    'default': {
+        'username': 'john.doe@example.com',
+        'exp': 1893456000,
+        'origIat': 1893455700,
+    },
+    'claims': {
+        'username': 'john.doe@example.com',
+        'userId': 123456,
+        'exp': 1893456000,
+        'origIat': 1893455700,
+        'isStaff': True,
+        'isSuperuser': False,
+        'groups': ['group-{}'.format(i) for i in range(20)],
+        'tenant': {'id': 'b6e1c2a0-4f3e-4c7a-9a8e-2d1f0b7c5e34', 'plan': 'enterprise'},
+    },
+    'permissions': {
+        'username': 'john.doe@example.com',
+        'exp': 1893456000,
+        'origIat': 1893455700,
+        'permissions': ['app_{}.change_model_{}'.format(i % 10, i) for i in range(300)],
+        'features': {'feature_{}'.format(i): i % 2 == 0 for i in range(100)},
+    },
+}
+
+
+def main(number=5000):
+    codecs = ['json']
+
+    try:
+        import orjson  # noqa: F401
+    except ImportError:
+        print('orjson is not installed, only the standard library is measured')
+    else:
+        codecs.append('orjson')
+
+    print('{:<12} {:>7} {:<7} {:>11} {:>11}'.format(
+        'payload', 'bytes', 'codec', 'encode µs', 'decode µs'))
+
+    for name, payload in PAYLOADS.items():
+        for json_codec in codecs:
+            codec = JSONWebTokenCodec('HS256', secret_key='benchmark-secret-key-of-32-bytes!',
+                                      json_codec=json_codec)
+            token = codec.encode(payload)
+            encode = timeit.timeit(lambda: codec.encode(payload), number=number)
+            decode = timeit.timeit(lambda: codec.decode(token), number=number)
+
+            print('{:<12} {:>7} {:<7} {:>11.1f} {:>11.1f}'.format(
+                name, len(token), json_codec,
+                encode / number * 1e6, decode / number * 1e6))
+
+
+if __name__ == '__main__':
+    main()
@@ -23,7 +23,7 @@ with open('requirements.txt', 'r') as fin:
 
 # What packages are optional?
 EXTRAS = {
-    # 'fancy feature': ['django'],
+    'orjson': ['orjson'],
 }
 
 # The rest you shouldn't have to touch too much :)
@@ -33,6 +33,16 @@ class AdminTests(AdminTestCase):
 
         self.assertFalse(is_expired)
 
+    def test_search_by_token(self):
+        request = self.request_factory.get('/')
+        qs = self.refresh_token_admin.get_queryset(request)
+
+        for search_term in (self.refresh_token.token,
+                            self.refresh_token.token_hash):
+            results, _ = self.refresh_token_admin.get_search_results(
+                request, qs, search_term)
+            self.assertEqual(list(results), [self.refresh_token])
+
 
 class FiltersTests(AdminTestCase):
 
@@ -0,0 +1,33 @@
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TransactionTestCase
+
+from ariadne_jwt.refresh_token.shortcuts import get_refresh_token
+
+
+class TokenHashMigrationTests(TransactionTestCase):
+    migrate_from = [('refresh_token', '0001_initial')]
+    migrate_to = [('refresh_token', '0002_token_hash')]
+
+    def migrate(self, targets):
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate(targets)
+        return executor.loader.project_state(targets).apps
+
+    def tearDown(self):
+        executor = MigrationExecutor(connection)
+        self.migrate(executor.loader.graph.leaf_nodes())
+        super(TokenHashMigrationTests, self).tearDown()
+
+    def test_tokens_hashed(self):
+        apps = self.migrate(self.migrate_from)
+        user = apps.get_model('auth', 'User').objects.create(username='test')
+        apps.get_model('refresh_token', 'RefreshToken').objects.create(
+            user_id=user.pk, token='token')
+
+        self.migrate(self.migrate_to)
+        refresh_token = get_refresh_token('token')
+
+        self.assertEqual(refresh_token.user_id, user.pk)
+        self.assertEqual(len(refresh_token.token_hash), 64)
@@ -16,6 +16,14 @@ class AbstractRefreshTokenTests(UserTestCase):
     def test_str(self):
         self.assertEqual(str(self.refresh_token), self.refresh_token.token)
 
+    def test_token_hashed(self):
+        refresh_token = type(self.refresh_token).objects.get(
+            pk=self.refresh_token.pk)
+
+        self.assertIsNone(refresh_token.token)
+        self.assertEqual(refresh_token.token_hash,
+                         refresh_token.hash_token(self.refresh_token.token))
+
     def test_generate_token(self):
         token = self.refresh_token.generate_token()
 
@@ -2,6 +2,7 @@ from ariadne_jwt.settings import jwt_settings
 from ariadne_jwt.exceptions import JSONWebTokenError
 from ariadne_jwt.backends import JSONWebTokenBackend
 
+from .decorators import override_jwt_settings
 from .testcases import TestCase
 
 
@@ -47,3 +48,8 @@ class BackendsTests(TestCase):
     def test_get_user(self):
         user = self.backend.get_user(self.user.get_username())
         self.assertEqual(user, self.user)
+
+    @override_jwt_settings(JWT_USER_PK_CLAIM='userId')
+    def test_get_user_by_pk(self):
+        user = self.backend.get_user(self.user.pk)
+        self.assertEqual(user, self.user)
@@ -0,0 +1,194 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+
+from ariadne_jwt import cache, exceptions, utils
+from ariadne_jwt.settings import jwt_settings
+
+from .decorators import override_jwt_settings
+from .testcases import TestCase
+
+
+class LRUCacheTests(TestCase):
+
+    def test_evicts_least_recently_used(self):
+        lru = cache.LRUCache(max_size=2)
+        lru.set('a', 1)
+        lru.set('b', 2)
+        lru.get('a')
+        lru.set('c', 3)
+
+        self.assertIsNone(lru.get('b'))
+        self.assertEqual(lru.get('a'), 1)
+        self.assertEqual(lru.get('c'), 3)
+
+    def test_expired_entry(self):
+        lru = cache.LRUCache(max_size=2, timer=lambda: 100)
+        lru.set('a', 1, expires=100)
+
+        self.assertIsNone(lru.get('a'))
+        self.assertEqual(len(lru), 0)
+
+    def test_stats(self):
+        lru = cache.LRUCache(max_size=2)
+        lru.set('a', 1)
+        lru.get('a')
+        lru.get('b')
+
+        self.assertEqual(lru.stats(), {
+            'hits': 1,
+            'misses': 1,
+            'size': 1,
+            'max_size': 2,
+        })
+
+
+class TokenCacheTests(TestCase):
+
+    @override_jwt_settings(JWT_TOKEN_CACHE=True)
+    def test_get_payload_cached(self):
+        with mock.patch.object(jwt_settings, 'JWT_DECODE_HANDLER',
+                               wraps=utils.jwt_decode) as decode_mock:
+            first = utils.get_payload(self.token)
+            second = utils.get_payload(self.token)
+
+        decode_mock.assert_called_once()
+        self.assertEqual(first, second)
+        self.assertIsNot(first, second)
+        self.assertEqual(cache.get_token_cache().hits, 1)
+
+    @override_jwt_settings(JWT_TOKEN_CACHE=True, JWT_LEEWAY=10)
+    def test_entry_expires_before_exp(self):
+        utils.get_payload(self.token)
+        lru = cache.get_token_cache()
+        lru.timer = lambda: self.payload['exp'] - 10
+
+        self.assertIsNone(cache.get_cached_payload(self.token))
+
+    @override_jwt_settings(JWT_TOKEN_CACHE=True)
+    def test_cleared_on_reload(self):
+        utils.get_payload(self.token)
+        self.assertEqual(len(cache.get_token_cache()), 1)
+
+        jwt_settings.reload()
+        self.assertEqual(len(cache.get_token_cache()), 0)
+
+    def test_disabled_by_default(self):
+        utils.get_payload(self.token)
+        self.assertEqual(len(cache.get_token_cache()), 0)
+
+
+class RejectedTokenCacheTests(TestCase):
+
+    @override_jwt_settings(JWT_REJECTED_TOKEN_CACHE=True)
+    def test_rejection_cached(self):
+        with mock.patch.object(jwt_settings, 'JWT_DECODE_HANDLER',
+                               wraps=utils.jwt_decode) as decode_mock:
+            for _ in range(2):
+                with self.assertRaisesMessage(exceptions.JSONWebTokenError,
+                                              'Error decoding signature'):
+                    utils.get_payload('invalid')
+
+        decode_mock.assert_called_once()
+        self.assertEqual(cache.get_rejected_token_cache().hits, 1)
+
+    @override_jwt_settings(JWT_REJECTED_TOKEN_CACHE=True,
+                           JWT_REJECTED_TOKEN_CACHE_MAX_SIZE=1)
+    def test_max_size(self):
+        for token in ('a', 'b'):
+            with self.assertRaises(exceptions.JSONWebTokenError):
+                utils.get_payload(token)
+
+        self.assertEqual(len(cache.get_rejected_token_cache()), 1)
+
+    @override_jwt_settings(JWT_REJECTED_TOKEN_CACHE=True)
+    def test_expired_signature_cached(self):
+        error = exceptions.JSONWebTokenExpired()
+        cache.cache_rejection(self.token, error)
+
+        with self.assertRaisesMessage(exceptions.JSONWebTokenExpired, str(error)):
+            utils.get_payload(self.token)
+
+
+class UserCacheTests(TestCase):
+
+    def setUp(self):
+        super(UserCacheTests, self).setUp()
+        caches['default'].clear()
+
+    @override_jwt_settings(JWT_USER_CACHE=True)
+    def test_user_cached(self):
+        utils.get_user_by_natural_key(self.user.get_username())
+
+        with self.assertNumQueries(0):
+            user = utils.get_user_by_natural_key(self.user.get_username())
+
+        self.assertEqual(user, self.user)
+
+    @override_jwt_settings(JWT_USER_CACHE=True, JWT_USER_CACHE_ALIAS='default')
+    def test_django_cache(self):
+        utils.get_user_by_natural_key(self.user.get_username())
+
+        with self.assertNumQueries(0):
+            user = utils.get_user_by_natural_key(self.user.get_username())
+
+        self.assertEqual(user, self.user)
+
+    @override_jwt_settings(JWT_USER_CACHE=True)
+    def test_missing_user_cached(self):
+        utils.get_user_by_natural_key('missing')
+
+        with self.assertNumQueries(0):
+            self.assertIsNone(utils.get_user_by_natural_key('missing'))
+
+    @override_jwt_settings(JWT_USER_CACHE=True)
+    def test_invalidated_on_save(self):
+        utils.get_user_by_natural_key(self.user.get_username())
+        self.user.is_active = False
+        self.user.save()
+
+        user = utils.get_user_by_natural_key(self.user.get_username())
+        self.assertFalse(user.is_active)
+
+    @override_jwt_settings(JWT_USER_CACHE=True, JWT_USER_CACHE_ALIAS='default')
+    def test_invalidated_on_username_change(self):
+        username = self.user.get_username()
+        utils.get_user_by_natural_key(username)
+        self.user.username = 'renamed'
+        self.user.save()
+
+        self.assertIsNone(utils.get_user_by_natural_key(username))
+
+    @override_jwt_settings(JWT_USER_CACHE=True)
+    def test_pk_invalidated_on_save(self):
+        utils.get_user_by_pk(self.user.pk)
+        self.user.is_active = False
+        self.user.save()
+
+        with self.assertNumQueries(1):
+            user = utils.get_user_by_pk(self.user.pk)
+
+        self.assertFalse(user.is_active)
+
+    @override_jwt_settings(JWT_USER_CACHE=True)
+    def test_invalidated_on_delete(self):
+        username = self.user.get_username()
+        utils.get_user_by_natural_key(username)
+        self.user.delete()
+
+        self.assertIsNone(utils.get_user_by_natural_key(username))
+
+    @override_jwt_settings(JWT_USER_CACHE=True, JWT_USER_CACHE_ALIAS='default')
+    def test_every_key_invalidated(self):
+        username = self.user.get_username()
+        utils.get_user_by_natural_key(username)
+        utils.get_user_by_pk(self.user.pk)
+        get_user_model().objects.filter(pk=self.user.pk).update(
+            username='renamed')
+        self.user.refresh_from_db()
+        self.user.save()
+
+        self.assertIsNone(utils.get_user_by_natural_key(username))
+        self.assertEqual(utils.get_user_by_pk(self.user.pk).get_username(),
+                         'renamed')
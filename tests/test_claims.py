@@ -0,0 +1,86 @@
+from django.contrib.auth.models import Group, Permission
+
+from ariadne_jwt import exceptions
+from ariadne_jwt.backends import JSONWebTokenBackend
+from ariadne_jwt.claims import ClaimsUser
+from ariadne_jwt.settings import jwt_settings
+from ariadne_jwt.utils import jwt_encode, jwt_payload
+
+from .decorators import override_jwt_settings
+from .testcases import TestCase
+
+
+@override_jwt_settings(JWT_CLAIMS_USER=True, JWT_USER_PK_CLAIM='userId')
+class ClaimsUserTests(TestCase):
+
+    def setUp(self):
+        super(ClaimsUserTests, self).setUp()
+        self.user.is_staff = True
+        self.user.save()
+        self.user.groups.add(Group.objects.create(name='editors'))
+
+    def claims_user(self):
+        return ClaimsUser(jwt_payload(self.user))
+
+    def test_authenticate(self):
+        headers = {
+            jwt_settings.JWT_AUTH_HEADER: '{0} {1}'.format(
+                jwt_settings.JWT_AUTH_HEADER_PREFIX,
+                jwt_encode(jwt_payload(self.user))),
+        }
+        request = self.request_factory.get('/', **headers)
+
+        with self.assertNumQueries(0):
+            user = JSONWebTokenBackend().authenticate(request=request)
+
+            self.assertIsInstance(user, ClaimsUser)
+            self.assertTrue(user.is_authenticated)
+            self.assertTrue(user.is_active)
+            self.assertTrue(user.is_staff)
+            self.assertEqual(user.pk, self.user.pk)
+            self.assertEqual(user.group_names, {'editors'})
+            self.assertEqual(user.get_username(), self.user.get_username())
+
+    def test_deleted_user(self):
+        user = self.claims_user()
+        self.user.delete()
+
+        self.assertTrue(user.is_authenticated)
+
+        with self.assertRaisesMessage(exceptions.JSONWebTokenError,
+                                      'Invalid payload'):
+            user.email
+
+    def test_inactive_user(self):
+        user = self.claims_user()
+        self.user.is_active = False
+        self.user.save()
+
+        self.assertTrue(user.is_active)
+
+        with self.assertRaisesMessage(exceptions.JSONWebTokenError,
+                                      'User is disabled'):
+            user.get_user()
+
+    def test_lazy_user(self):
+        user = self.claims_user()
+
+        with self.assertNumQueries(1):
+            self.assertEqual(user.date_joined, self.user.date_joined)
+            self.assertEqual(user.email, self.user.email)
+
+        self.assertEqual(user, self.user)
+
+    def test_has_perms(self):
+        user = self.claims_user()
+        self.assertFalse(user.has_perms(['auth.add_user']))
+
+        self.user.user_permissions.add(Permission.objects.get(codename='add_user'))
+        self.assertTrue(self.claims_user().has_perms(['auth.add_user']))
+
+    def test_superuser_has_perms(self):
+        self.user.is_superuser = True
+        user = self.claims_user()
+
+        with self.assertNumQueries(0):
+            self.assertTrue(user.has_perms(['auth.add_user']))
@@ -0,0 +1,272 @@
+import json
+import sys
+from types import SimpleNamespace
+from unittest import mock, skipIf
+
+import jwt
+
+from django.core.exceptions import ImproperlyConfigured
+
+from ariadne_jwt import codec, exceptions, utils
+from ariadne_jwt.settings import jwt_settings
+
+from .decorators import override_jwt_settings
+from .testcases import TestCase
+
+try:
+    from cryptography.hazmat.primitives import serialization
+    from cryptography.hazmat.primitives.asymmetric import ec, ed25519, rsa
+except ImportError:
+    serialization = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def pem_keys(private_key):
+    private_pem = private_key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption())
+
+    public_pem = private_key.public_key().public_bytes(
+        serialization.Encoding.PEM,
+        serialization.PublicFormat.SubjectPublicKeyInfo)
+
+    return private_pem.decode(), public_pem.decode()
+
+
+class CodecTests(TestCase):
+
+    def test_from_settings(self):
+        jwt_codec = codec.JSONWebTokenCodec.from_settings()
+
+        self.assertEqual(jwt_codec.algorithms, [jwt_settings.JWT_ALGORITHM])
+        self.assertEqual(jwt_codec.options, {
+            'verify_exp': jwt_settings.JWT_VERIFY_EXPIRATION,
+        })
+        self.assertIsInstance(jwt_codec.signing_key, bytes)
+
+    def test_encode_decode(self):
+        jwt_codec = codec.get_codec()
+        token = jwt_codec.encode(self.payload)
+
+        self.assertEqual(jwt_codec.decode(token), self.payload)
+
+    def test_signer(self):
+        jwt_codec = codec.get_codec()
+        sign = jwt_codec.get_signer()
+
+        self.assertEqual(sign(dict(self.payload)), jwt_codec.encode(self.payload))
+
+    @override_jwt_settings(JWT_KEYRING={'1': 'secret'}, JWT_KEY_ID='1')
+    def test_signer_key_id(self):
+        jwt_codec = codec.get_codec()
+        token = jwt_codec.get_signer()(dict(self.payload))
+
+        self.assertEqual(token, jwt_codec.encode(self.payload))
+        self.assertEqual(jwt.get_unverified_header(token)['kid'], '1')
+
+    def test_get_codec_is_reused(self):
+        self.assertIs(codec.get_codec(), codec.get_codec())
+
+    def test_rebuilt_on_setting_changed(self):
+        jwt_codec = codec.get_codec()
+
+        with override_jwt_settings(JWT_ISSUER='test'):
+            self.assertIsNot(codec.get_codec(), jwt_codec)
+            self.assertEqual(codec.get_codec().issuer, 'test')
+
+        self.assertIsNone(codec.get_codec().issuer)
+
+
+class JSONCodecTests(TestCase):
+
+    def test_stdlib(self):
+        dumps, loads = codec.get_json_codec('json')
+        self.assertEqual(dumps({'a': 1}), b'{"a":1}')
+
+    def test_auto_fallback(self):
+        with mock.patch.dict(sys.modules, {'orjson': None}):
+            self.assertEqual(codec.get_json_codec('auto'),
+                             codec.get_json_codec('json'))
+
+    def test_module(self):
+        module = SimpleNamespace(dumps=json.dumps, loads=json.loads)
+
+        with mock.patch.dict(sys.modules, {'fastjson': module}):
+            dumps, loads = codec.get_json_codec('fastjson')
+
+        self.assertEqual(dumps({'a': 1}), b'{"a": 1}')
+        self.assertIs(loads, json.loads)
+
+    @skipIf(orjson is None, 'orjson is not installed')
+    @skipIf(not codec.PAYLOAD_HOOKS, 'PyJWT version not supported')
+    @override_jwt_settings(JWT_JSON_CODEC='auto')
+    def test_orjson(self):
+        jwt_codec = codec.get_codec()
+        token = jwt_codec.encode(self.payload)
+
+        self.assertIs(jwt_codec.jwt.dumps, orjson.dumps)
+        self.assertEqual(utils.get_payload(token), self.payload)
+        self.assertEqual(utils.get_payload(self.token), self.payload)
+        self.assertEqual(jwt_codec.get_signer()(dict(self.payload)), token)
+
+    @skipIf(not codec.PAYLOAD_HOOKS, 'PyJWT version not supported')
+    def test_payload_hooks_called(self):
+        dumps = mock.Mock(wraps=codec.json_dumps)
+        loads = mock.Mock(wraps=json.loads)
+        module = SimpleNamespace(dumps=dumps, loads=loads)
+
+        with mock.patch.dict(sys.modules, {'fastjson': module}):
+            jwt_codec = codec.JSONWebTokenCodec(
+                'HS256', 'secret-key-with-enough-entropy', json_codec='fastjson')
+
+        self.assertEqual(jwt_codec.decode(jwt_codec.encode(self.payload)),
+                         self.payload)
+        dumps.assert_called_once_with(self.payload)
+        loads.assert_called_once()
+
+    @mock.patch('ariadne_jwt.codec.PAYLOAD_HOOKS', False)
+    def test_payload_hooks_missing(self):
+        with self.assertRaises(ImproperlyConfigured):
+            codec.JSONWebTokenCodec('HS256', 'secret', json_codec='orjson')
+
+        jwt_codec = codec.JSONWebTokenCodec('HS256', 'secret',
+                                            json_codec='auto')
+        self.assertIs(jwt_codec.jwt.dumps, codec.json_dumps)
+
+    @override_jwt_settings(JWT_JSON_CODEC='auto')
+    def test_invalid_payload(self):
+        token = jwt.api_jws.encode(b'[]', jwt_settings.JWT_SECRET_KEY,
+                                   jwt_settings.JWT_ALGORITHM)
+
+        with self.assertRaisesMessage(exceptions.JSONWebTokenError,
+                                      'Error decoding signature'):
+            utils.get_payload(token)
+
+
+class KeyringTests(TestCase):
+    keyring = {
+        'old': 'old-secret-key-with-enough-entropy',
+        'new': 'new-secret-key-with-enough-entropy',
+    }
+
+    def encode(self, key_id):
+        with override_jwt_settings(JWT_KEYRING=self.keyring, JWT_KEY_ID=key_id):
+            return utils.jwt_encode(self.payload)
+
+    def test_kid_header(self):
+        token = self.encode('new')
+        self.assertEqual(jwt.get_unverified_header(token)['kid'], 'new')
+
+    @override_jwt_settings(JWT_KEYRING=keyring, JWT_KEY_ID='new')
+    def test_rotated_key(self):
+        token = self.encode('old')
+        self.assertEqual(utils.get_payload(token), self.payload)
+
+    @override_jwt_settings(JWT_KEYRING=keyring, JWT_KEY_ID='new')
+    def test_token_without_kid(self):
+        with self.assertRaises(exceptions.JSONWebTokenError):
+            utils.get_payload(self.token)
+
+    @override_jwt_settings(JWT_KEYRING=keyring, JWT_KEY_ID='new',
+                           JWT_KEYRING_DEFAULT_KEY=True)
+    def test_token_without_kid_default_key(self):
+        self.assertEqual(utils.get_payload(self.token), self.payload)
+
+    def test_key_id_not_in_keyring(self):
+        with self.assertRaises(ImproperlyConfigured):
+            codec.JSONWebTokenCodec('HS256', 'secret', keyring=self.keyring,
+                                    key_id='missing')
+
+        with self.assertRaises(ImproperlyConfigured):
+            codec.JSONWebTokenCodec('HS256', 'secret', keyring=self.keyring)
+
+    def test_unknown_kid(self):
+        token = self.encode('old')
+
+        with override_jwt_settings(JWT_KEYRING={'new': self.keyring['new']},
+                                   JWT_KEY_ID='new'):
+            with mock.patch.object(codec.JSONWebToken, 'decode') as decode_mock:
+                with self.assertRaises(exceptions.JSONWebTokenError):
+                    utils.get_payload(token)
+
+        decode_mock.assert_not_called()
+
+
+@skipIf(serialization is None, 'cryptography is not installed')
+class AsymmetricCodecTests(TestCase):
+
+    def setUp(self):
+        super(AsymmetricCodecTests, self).setUp()
+        self.private_key, self.public_key = pem_keys(
+            rsa.generate_private_key(public_exponent=65537, key_size=2048))
+
+    def test_sign_and_verify(self):
+        with override_jwt_settings(JWT_ALGORITHM='RS256',
+                                   JWT_PRIVATE_KEY=self.private_key):
+            token = utils.jwt_encode(self.payload)
+
+        with override_jwt_settings(JWT_ALGORITHM='RS256',
+                                   JWT_PUBLIC_KEY=self.public_key):
+            self.assertEqual(utils.get_payload(token), self.payload)
+
+            with self.assertRaises(ImproperlyConfigured):
+                utils.jwt_encode(self.payload)
+
+    def test_public_key_from_private_key(self):
+        private_key, _ = pem_keys(ec.generate_private_key(ec.SECP256R1()))
+
+        with override_jwt_settings(JWT_ALGORITHM='ES256',
+                                   JWT_PRIVATE_KEY=private_key):
+            token = utils.jwt_encode(self.payload)
+            self.assertEqual(utils.jwt_decode(token), self.payload)
+
+    @override_jwt_settings(JWT_ALGORITHM='RS256')
+    def test_missing_public_key(self):
+        with self.assertRaises(ImproperlyConfigured):
+            utils.jwt_decode(self.token)
+
+    def test_signer_matches_pyjwt(self):
+        keys = {
+            'RS256': rsa.generate_private_key(public_exponent=65537,
+                                              key_size=2048),
+            'PS256': rsa.generate_private_key(public_exponent=65537,
+                                              key_size=2048),
+            'ES256': ec.generate_private_key(ec.SECP256R1()),
+            'ES384': ec.generate_private_key(ec.SECP384R1()),
+            'EdDSA': ed25519.Ed25519PrivateKey.generate(),
+        }
+        cases = [(algorithm, pem_keys(key))
+                 for algorithm, key in keys.items()]
+        cases += [(algorithm, ('secret-key-with-enough-entropy-' * 2,) * 2)
+                  for algorithm in ('HS256', 'HS384', 'HS512')]
+
+        for algorithm, (private_key, public_key) in cases:
+            for key_id in (None, 'kid'):
+                with self.subTest(algorithm=algorithm, key_id=key_id):
+                    jwt_codec = codec.JSONWebTokenCodec(
+                        algorithm,
+                        secret_key=private_key,
+                        private_key=private_key,
+                        keyring={key_id: public_key} if key_id else None,
+                        key_id=key_id)
+
+                    token = jwt_codec.get_signer()(dict(self.payload))
+                    expected = jwt_codec.encode(self.payload)
+
+                    self.assertEqual(
+                        jwt.decode(token, public_key, algorithms=[algorithm]),
+                        self.payload)
+                    self.assertEqual(
+                        jwt.get_unverified_header(token).get('kid'), key_id)
+
+                    if algorithm.startswith(('ES', 'PS')):
+                        # ECDSA and PSS signatures are randomized
+                        token, expected = (token.rsplit('.', 1)[0],
+                                           expected.rsplit('.', 1)[0])
+
+                    self.assertEqual(token, expected)
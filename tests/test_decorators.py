@@ -1,8 +1,11 @@
-from django.contrib.auth.models import AnonymousUser, Permission
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser, Group, Permission
 
-from ariadne_jwt import decorators, exceptions
+from ariadne_jwt import decorators, exceptions, utils
+from ariadne_jwt.claims import ClaimsUser
 from ariadne_jwt.settings import jwt_settings
 
+from .decorators import override_jwt_settings
 from .testcases import TestCase
 
 
@@ -87,6 +90,58 @@ class PermissionRequiredTests(TestCase):
             wrapped(self.info(self.user))
 
 
+@override_jwt_settings(JWT_PERMISSIONS_SNAPSHOT=True)
+class PermissionsSnapshotTests(TestCase):
+
+    def test_permissions_loaded_once(self):
+        @decorators.permission_required(['auth.add_user', 'auth.change_user'])
+        def wrapped(info):
+            """Decorated function"""
+
+        group = Group.objects.create(name='editors')
+        group.permissions.add(Permission.objects.get(codename='change_user'))
+        self.user.groups.add(group)
+        self.user.user_permissions.add(Permission.objects.get(codename='add_user'))
+        info = self.info(self.user)
+
+        with self.assertNumQueries(1):
+            for _ in range(10):
+                self.assertIsNone(wrapped(info))
+
+    def test_permission_denied(self):
+        @decorators.permission_required('auth.add_user')
+        def wrapped(info):
+            """Decorated function"""
+
+        with self.assertRaises(exceptions.PermissionDenied):
+            wrapped(self.info(self.user))
+
+        with self.assertRaises(exceptions.PermissionDenied):
+            wrapped(self.info(AnonymousUser()))
+
+    def test_superuser(self):
+        @decorators.permission_required('auth.add_user')
+        def wrapped(info):
+            """Decorated function"""
+
+        self.user.is_superuser = True
+
+        with self.assertNumQueries(0):
+            self.assertIsNone(wrapped(self.info(self.user)))
+
+    @override_jwt_settings(JWT_PERMISSIONS_SNAPSHOT=True, JWT_CLAIMS_USER=True)
+    def test_claims_user(self):
+        @decorators.permission_required('auth.view_user')
+        def wrapped(info):
+            """Decorated function"""
+
+        self.user.user_permissions.add(Permission.objects.get(codename='view_user'))
+        user = ClaimsUser(utils.jwt_payload(self.user))
+
+        self.assertIsNone(user.pk)
+        self.assertIsNone(wrapped(self.info(user)))
+
+
 class TokenAuthTests(TestCase):
 
     def test_already_authenticated(self):
@@ -122,6 +177,75 @@ class TokenAuthTests(TestCase):
         self.assertIsNotNone(result.get('payload'))
 
 
+class AsyncDecoratorsTests(TestCase):
+
+    async def test_login_required(self):
+        @decorators.login_required
+        async def wrapped(info):
+            return 'ok'
+
+        self.assertTrue(decorators.iscoroutinefunction(wrapped))
+        self.assertEqual(await wrapped(self.info(self.user)), 'ok')
+
+        with self.assertRaises(exceptions.PermissionDenied):
+            await wrapped(self.info(AnonymousUser()))
+
+    async def test_stacked(self):
+        @decorators.login_required
+        @decorators.staff_member_required
+        async def wrapped(info):
+            return 'ok'
+
+        self.user.is_staff = True
+        self.assertEqual(await wrapped(self.info(self.user)), 'ok')
+
+    async def test_permission_required(self):
+        @decorators.permission_required('auth.add_user')
+        async def wrapped(info):
+            return 'ok'
+
+        with self.assertRaises(exceptions.PermissionDenied):
+            await wrapped(self.info(self.user))
+
+        perm = await Permission.objects.aget(codename='add_user')
+        await self.user.user_permissions.aadd(perm)
+        user = await get_user_model().objects.aget(pk=self.user.pk)
+
+        self.assertEqual(await wrapped(self.info(user)), 'ok')
+
+    @override_jwt_settings(JWT_PERMISSIONS_SNAPSHOT=True)
+    async def test_permissions_snapshot(self):
+        @decorators.permission_required('auth.add_user')
+        async def wrapped(info):
+            return 'ok'
+
+        perm = await Permission.objects.aget(codename='add_user')
+        await self.user.user_permissions.aadd(perm)
+
+        self.assertEqual(await wrapped(self.info(self.user)), 'ok')
+
+    async def test_token_auth(self):
+        @decorators.token_auth
+        async def wrapped(root, info, **kwargs):
+            return {}
+
+        info_mock = self.info(AnonymousUser())
+        result = await wrapped(None, info_mock, password='dolphins',
+                               username=self.user.get_username())
+
+        self.assertIsNotNone(result.get('token'))
+        self.assertEqual(info_mock.context.get('request').user, self.user)
+
+    async def test_token_auth_invalid_credentials(self):
+        @decorators.token_auth
+        async def wrapped(root, info, **kwargs):
+            return {}
+
+        with self.assertRaises(exceptions.JSONWebTokenError):
+            await wrapped(None, self.info(AnonymousUser()), password='wrong',
+                          username=self.user.get_username())
+
+
 class StackedDecoratorsTests(TestCase):
 
     def test_login_and_staff_member_required(self):
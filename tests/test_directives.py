@@ -0,0 +1,125 @@
+from asgiref.sync import iscoroutinefunction
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Permission
+
+from ariadne import QueryType
+
+from ariadne_jwt import GenericScalar, jwt_directives, jwt_schema
+from ariadne_jwt.decorators import is_authenticated, login_required
+from ariadne_jwt.exceptions import PermissionDenied
+from ariadne_jwt.testcases import JSONWebTokenTestCase
+
+from .testcases import TestCase
+
+
+class DirectivesTests(TestCase, JSONWebTokenTestCase):
+    type_defs = '''
+        type Query {
+            viewer: String @loginRequired
+            staff: String @staffRequired
+            users: String @hasPerm(perms: ["auth.add_user"])
+            admin: String @loginRequired @staffRequired
+            public: String
+        }
+        ''' + jwt_schema
+
+    def setUp(self):
+        super(DirectivesTests, self).setUp()
+        query = QueryType()
+
+        for name in ('viewer', 'staff', 'users', 'admin', 'public'):
+            query.set_field(name, lambda obj, info: 'ok')
+
+        self.client.schema(self.type_defs, query, GenericScalar,
+                           directives=jwt_directives)
+
+    def execute(self, field):
+        return self.client.execute('{ %s }' % field)
+
+    def test_login_required(self):
+        response = self.execute('viewer')
+        self.assertEqual(response.errors[0]['message'],
+                         'You do not have permission to perform this action')
+
+        self.client.authenticate(self.user)
+        response = self.execute('viewer')
+        self.assertEqual(response.data, {'viewer': 'ok'})
+
+    def test_staff_required(self):
+        self.client.authenticate(self.user)
+        response = self.execute('staff')
+        self.assertIsNotNone(response.errors)
+
+        self.user.is_staff = True
+        self.user.save()
+        response = self.execute('staff')
+        self.assertEqual(response.data, {'staff': 'ok'})
+
+    def test_has_perm(self):
+        self.client.authenticate(self.user)
+        response = self.execute('users')
+        self.assertIsNotNone(response.errors)
+
+        perm = Permission.objects.get(codename='add_user')
+        self.user.user_permissions.add(perm)
+        response = self.execute('users')
+        self.assertEqual(response.data, {'users': 'ok'})
+
+    def test_merged_requirements(self):
+        field = self.client._schema.query_type.fields['admin']
+
+        self.assertEqual(len(field.resolve.jwt_directive_tests), 2)
+
+    def test_public(self):
+        response = self.execute('public')
+        self.assertEqual(response.data, {'public': 'ok'})
+
+
+class DecoratedResolverTests(TestCase, JSONWebTokenTestCase):
+    type_defs = '''
+        type Query {
+            viewer: String @loginRequired
+        }
+        ''' + jwt_schema
+
+    def test_decorator_tests_merged(self):
+        @login_required
+        def resolve_viewer(obj, info):
+            return 'ok'
+
+        query = QueryType()
+        query.set_field('viewer', resolve_viewer)
+        self.client.schema(self.type_defs, query, directives=jwt_directives)
+        resolver = self.client._schema.query_type.fields['viewer'].resolve
+
+        self.assertEqual(resolver.jwt_tests,
+                         (is_authenticated, is_authenticated))
+        self.assertEqual(resolver.jwt_directive_tests, (is_authenticated,))
+
+
+class AsyncResolverTests(TestCase, JSONWebTokenTestCase):
+    type_defs = '''
+        type Query {
+            users: String @hasPerm(perms: ["auth.add_user"])
+        }
+        ''' + jwt_schema
+
+    async def test_async_resolver(self):
+        async def resolve_users(obj, info):
+            return 'ok'
+
+        query = QueryType()
+        query.set_field('users', resolve_users)
+        self.client.schema(self.type_defs, query, directives=jwt_directives)
+        resolver = self.client._schema.query_type.fields['users'].resolve
+
+        self.assertTrue(iscoroutinefunction(resolver))
+
+        with self.assertRaises(PermissionDenied):
+            await resolver(None, self.info(self.user))
+
+        perm = await Permission.objects.aget(codename='add_user')
+        await self.user.user_permissions.aadd(perm)
+        user = await get_user_model().objects.aget(pk=self.user.pk)
+
+        self.assertEqual(await resolver(None, self.info(user)), 'ok')
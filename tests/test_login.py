@@ -0,0 +1,137 @@
+import threading
+import time
+from unittest import mock
+
+from django.contrib.auth.models import AnonymousUser
+
+from ariadne_jwt import decorators, exceptions
+from ariadne_jwt.login import LoginExecutor, get_login_executor
+from ariadne_jwt.settings import jwt_settings
+
+from .decorators import override_jwt_settings
+from .testcases import TestCase
+
+
+class LoginExecutorTests(TestCase):
+
+    def setUp(self):
+        super(LoginExecutorTests, self).setUp()
+        self.executor = LoginExecutor(max_workers=1, max_queue=1)
+        self.addCleanup(self.executor.shutdown)
+
+    @mock.patch('ariadne_jwt.login.authenticate')
+    def test_authenticate(self, authenticate_mock):
+        authenticate_mock.return_value = self.user
+        user = self.executor.authenticate(None, username='test',
+                                          password='dolphins')
+
+        self.assertEqual(user, self.user)
+        self.assertEqual(self.executor.stats()['completed'], 1)
+
+    @mock.patch('ariadne_jwt.login.authenticate')
+    def test_saturated(self, authenticate_mock):
+        release = threading.Event()
+        authenticate_mock.side_effect = lambda *args, **kwargs: release.wait()
+
+        futures = [self.executor.submit(None) for _ in range(2)]
+
+        with self.assertRaises(exceptions.LoginUnavailable):
+            self.executor.submit(None)
+
+        release.set()
+
+        for future in futures:
+            future.result()
+
+        stats = self.executor.stats()
+        self.assertEqual(stats['rejected'], 1)
+        self.assertEqual(stats['completed'], 2)
+        self.assertEqual(stats['queued'], 0)
+
+    @mock.patch('ariadne_jwt.login.authenticate')
+    def test_queue_timeout(self, authenticate_mock):
+        self.executor.timeout = 10
+        self.executor.timer = iter([0, 11]).__next__
+
+        with self.assertRaises(exceptions.LoginUnavailable):
+            self.executor.authenticate(None)
+
+        authenticate_mock.assert_not_called()
+        self.assertEqual(self.executor.stats()['timeouts'], 1)
+
+    @mock.patch('ariadne_jwt.login.authenticate')
+    def test_queue_timeout_while_workers_busy(self, authenticate_mock):
+        release = threading.Event()
+        authenticate_mock.side_effect = lambda *args, **kwargs: release.wait()
+        self.executor.timeout = 0.05
+        future = self.executor.submit(None)
+
+        with self.assertRaises(exceptions.LoginUnavailable):
+            self.executor.authenticate(None)
+
+        release.set()
+        future.result()
+
+        stats = self.executor.stats()
+        self.assertEqual(authenticate_mock.call_count, 1)
+        self.assertEqual(stats['timeouts'], 1)
+        self.assertEqual(stats['queued'], 0)
+
+    @mock.patch('ariadne_jwt.login.authenticate')
+    async def test_async_queue_timeout_while_workers_busy(self, authenticate_mock):
+        release = threading.Event()
+        authenticate_mock.side_effect = lambda *args, **kwargs: release.wait()
+        self.executor.timeout = 0.05
+        future = self.executor.submit(None)
+
+        with self.assertRaises(exceptions.LoginUnavailable):
+            await self.executor.aauthenticate(None)
+
+        release.set()
+        future.result()
+        self.assertEqual(self.executor.stats()['timeouts'], 1)
+
+    @mock.patch('ariadne_jwt.login.authenticate')
+    def test_running_login_not_timed_out(self, authenticate_mock):
+        authenticate_mock.side_effect = lambda *args, **kwargs: time.sleep(0.1)
+        self.executor.timeout = 0.05
+
+        self.executor.authenticate(None)
+        self.assertEqual(self.executor.stats()['timeouts'], 0)
+
+
+@override_jwt_settings(JWT_LOGIN_EXECUTOR=True)
+class TokenAuthExecutorTests(TestCase):
+
+    @mock.patch('ariadne_jwt.login.authenticate')
+    def test_token_auth(self, authenticate_mock):
+        authenticate_mock.return_value = self.user
+
+        @decorators.token_auth
+        def wrapped(root, info, **kwargs):
+            return {}
+
+        result = wrapped(None, self.info(AnonymousUser()), password='dolphins',
+                         username=self.user.get_username())
+
+        self.assertIsNotNone(result.get('token'))
+        self.assertEqual(get_login_executor().stats()['completed'], 1)
+
+    @mock.patch('ariadne_jwt.login.authenticate')
+    async def test_async_token_auth(self, authenticate_mock):
+        authenticate_mock.return_value = self.user
+
+        @decorators.token_auth
+        async def wrapped(root, info, **kwargs):
+            return {}
+
+        result = await wrapped(None, self.info(AnonymousUser()),
+                               password='dolphins',
+                               username=self.user.get_username())
+
+        self.assertIsNotNone(result.get('token'))
+
+    def test_reset_on_reload(self):
+        executor = get_login_executor()
+        jwt_settings.reload()
+        self.assertIsNot(get_login_executor(), executor)
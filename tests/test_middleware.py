@@ -1,11 +1,21 @@
 import json
+from datetime import timedelta
 from unittest import mock
 
+from django.contrib.auth.models import AnonymousUser
+
 from django.http import JsonResponse
+from django.utils.functional import SimpleLazyObject
+from graphql import GraphQLResolveInfo
+
+from ariadne_jwt.decorators import login_required
+from ariadne_jwt.exceptions import PermissionDenied
 
 from ariadne_jwt.middleware import JSONWebTokenMiddleware
 from ariadne_jwt.settings import jwt_settings
+from ariadne_jwt.utils import get_payload, jwt_encode, jwt_payload
 
+from .decorators import override_jwt_settings
 from .testcases import TestCase
 
 
@@ -61,6 +71,25 @@ class MiddlewareTests(TestCase):
 
         self.get_response_mock.assert_called_once_with(request)
 
+    @override_jwt_settings(JWT_DIRECT_AUTHENTICATION=True)
+    def test_direct_authentication(self):
+        headers = {
+            jwt_settings.JWT_AUTH_HEADER: '{0} {1}'.format(
+                jwt_settings.JWT_AUTH_HEADER_PREFIX,
+                self.token),
+        }
+
+        request = self.request_factory.get('/', **headers)
+
+        with mock.patch('ariadne_jwt.middleware.authenticate') as authenticate_mock:
+            self.middleware(request)
+
+        authenticate_mock.assert_not_called()
+        self.assertEqual(request.user, self.user)
+        self.assertEqual(request._cached_user, self.user)
+        self.assertEqual(request.user.backend,
+                         'ariadne_jwt.backends.JSONWebTokenBackend')
+
     def test_user_is_authenticated(self):
         headers = {
             jwt_settings.JWT_AUTH_HEADER: '{0} {1}'.format(
@@ -73,3 +102,285 @@ class MiddlewareTests(TestCase):
         self.middleware(request)
 
         self.get_response_mock.assert_called_once_with(request)
+
+
+class ScopedMiddlewareTests(TestCase):
+
+    @override_jwt_settings(JWT_MIDDLEWARE_INCLUDE_PATHS=['/graphql'],
+                           JWT_MIDDLEWARE_EXCLUDE_PATHS=['/graphql/health'],
+                           JWT_MIDDLEWARE_EXCLUDE_METHODS=['options'])
+    def setUp(self):
+        super().setUp()
+
+        self.get_response_mock = mock.Mock(return_value=JsonResponse({}))
+        self.middleware = JSONWebTokenMiddleware(self.get_response_mock)
+
+    def request(self, method, path):
+        headers = {
+            jwt_settings.JWT_AUTH_HEADER: '{} invalid'.format(
+                jwt_settings.JWT_AUTH_HEADER_PREFIX),
+        }
+        return self.request_factory.generic(method, path, **headers)
+
+    def test_included_path(self):
+        response = self.middleware(self.request('POST', '/graphql/'))
+        self.assertEqual(response.status_code, 401)
+
+    def test_pass_through(self):
+        for method, path in (('POST', '/admin/'),
+                             ('POST', '/graphql/health'),
+                             ('OPTIONS', '/graphql/')):
+            response = self.middleware(self.request(method, path))
+
+            self.assertEqual(response.status_code, 200)
+            self.assertFalse(response.has_header('Vary'))
+
+
+@override_jwt_settings(JWT_LAZY_AUTHENTICATION=True)
+class LazyAuthenticationTests(TestCase):
+
+    def setUp(self):
+        super().setUp()
+
+        self.get_response_mock = mock.Mock(return_value=JsonResponse({}))
+        self.middleware = JSONWebTokenMiddleware(self.get_response_mock)
+
+    def request(self, token):
+        headers = {
+            jwt_settings.JWT_AUTH_HEADER: '{0} {1}'.format(
+                jwt_settings.JWT_AUTH_HEADER_PREFIX,
+                token),
+        }
+        return self.request_factory.get('/', **headers)
+
+    def test_authenticate_on_access(self):
+        request = self.request(self.token)
+
+        with mock.patch('ariadne_jwt.middleware.authenticate',
+                        return_value=self.user) as authenticate_mock:
+            self.middleware(request)
+            authenticate_mock.assert_not_called()
+
+            self.assertEqual(request.user, self.user)
+            self.assertEqual(request._cached_user, self.user)
+            authenticate_mock.assert_called_once_with(request=request)
+
+    def test_invalid_token(self):
+        request = self.request('invalid')
+        response = self.middleware(request)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(request.user.is_anonymous)
+
+    def test_user_is_authenticated(self):
+        request = self.request('invalid')
+        request.user = self.user
+        self.middleware(request)
+
+        self.assertEqual(request.user, self.user)
+
+
+@override_jwt_settings(JWT_LAZY_AUTHENTICATION=True)
+class AsyncLazyAuthenticationTests(TestCase):
+
+    def request(self, token):
+        headers = {
+            jwt_settings.JWT_AUTH_HEADER: '{0} {1}'.format(
+                jwt_settings.JWT_AUTH_HEADER_PREFIX,
+                token),
+        }
+        request = self.request_factory.get('/', **headers)
+
+        # As set by Django's AuthenticationMiddleware
+        async def auser():
+            return AnonymousUser()
+
+        request.user = SimpleLazyObject(AnonymousUser)
+        request.auser = auser
+        return request
+
+    async def execute(self, request):
+        @login_required
+        async def resolve_viewer(obj, info):
+            return 'ok'
+
+        async def get_response(request):
+            info = mock.Mock(context={'request': request},
+                             spec=GraphQLResolveInfo)
+            return JsonResponse({'viewer': await resolve_viewer(None, info)})
+
+        middleware = JSONWebTokenMiddleware(get_response)
+        return await middleware(request)
+
+    async def test_authenticate_on_access(self):
+        request = self.request(self.token)
+        response = await self.execute(request)
+
+        self.assertEqual(json.loads(response.content), {'viewer': 'ok'})
+        self.assertEqual(await request.auser(), self.user)
+        self.assertEqual(request.user, self.user)
+        self.assertEqual(request._acached_user, self.user)
+
+    async def test_invalid_token(self):
+        request = self.request('invalid')
+
+        with self.assertRaises(PermissionDenied):
+            await self.execute(request)
+
+        self.assertTrue((await request.auser()).is_anonymous)
+
+
+class AsyncMiddlewareTests(TestCase):
+
+    def setUp(self):
+        super().setUp()
+
+        self.get_response_mock = mock.AsyncMock(return_value=JsonResponse({}))
+        self.middleware = JSONWebTokenMiddleware(self.get_response_mock)
+
+    def request(self, token):
+        headers = {
+            jwt_settings.JWT_AUTH_HEADER: '{0} {1}'.format(
+                jwt_settings.JWT_AUTH_HEADER_PREFIX,
+                token),
+        }
+        request = self.request_factory.get('/', **headers)
+        request.user = AnonymousUser()
+        return request
+
+    def test_async_mode(self):
+        self.assertTrue(self.middleware.async_mode)
+        self.assertTrue(JSONWebTokenMiddleware.async_capable)
+
+    async def test_authenticate(self):
+        request = self.request(self.token)
+        response = await self.middleware(request)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(request.user, self.user)
+        self.assertEqual(request._cached_user, self.user)
+        self.assertIn('Authorization', response['Vary'])
+        self.get_response_mock.assert_awaited_once_with(request)
+
+    async def test_graphql_error(self):
+        response = await self.middleware(self.request('invalid'))
+        content = json.loads(response.content.decode('utf-8'))
+
+        self.assertEqual(response.status_code, 401)
+        self.assertIsNotNone(content['errors'])
+        self.get_response_mock.assert_not_called()
+
+    @override_jwt_settings(JWT_CLAIMS_USER=True)
+    async def test_claims_user_inline(self):
+        request = self.request(self.token)
+
+        with mock.patch('ariadne_jwt.backends.sync_to_async') as sync_to_async_mock:
+            await self.middleware(request)
+
+        sync_to_async_mock.assert_not_called()
+        self.assertTrue(request.user.is_authenticated)
+
+    @override_jwt_settings(JWT_DIRECT_AUTHENTICATION=True)
+    async def test_direct_authentication(self):
+        request = self.request(self.token)
+
+        with mock.patch('ariadne_jwt.middleware.aauthenticate') as authenticate_mock:
+            await self.middleware(request)
+
+        authenticate_mock.assert_not_called()
+        self.assertEqual(request.user, self.user)
+
+    @mock.patch('ariadne_jwt.middleware.aauthenticate', None)
+    async def test_backend_aauthenticate(self):
+        request = self.request(self.token)
+
+        with mock.patch('ariadne_jwt.middleware.authenticate') as authenticate_mock:
+            await self.middleware(request)
+
+        authenticate_mock.assert_not_called()
+        self.assertEqual(request.user, self.user)
+        self.assertEqual(request.user.backend,
+                         'ariadne_jwt.backends.JSONWebTokenBackend')
+
+    async def test_header_not_found(self):
+        request = self.request_factory.get('/')
+        await self.middleware(request)
+
+        self.get_response_mock.assert_awaited_once_with(request)
+
+
+@override_jwt_settings(JWT_SLIDING_REFRESH=True,
+                       JWT_SLIDING_REFRESH_THRESHOLD=timedelta(minutes=10))
+class SlidingRefreshTests(TestCase):
+
+    def setUp(self):
+        super().setUp()
+
+        self.get_response_mock = mock.Mock(return_value=JsonResponse({}))
+        self.middleware = JSONWebTokenMiddleware(self.get_response_mock)
+
+    def request(self):
+        headers = {
+            jwt_settings.JWT_AUTH_HEADER: '{0} {1}'.format(
+                jwt_settings.JWT_AUTH_HEADER_PREFIX,
+                self.token),
+        }
+        request = self.request_factory.get('/', **headers)
+        request.user = AnonymousUser()
+        return request
+
+    def test_renewed_token(self):
+        response = self.middleware(self.request())
+        token = response[jwt_settings.JWT_SLIDING_REFRESH_HEADER]
+        payload = get_payload(token)
+
+        self.assertGreaterEqual(payload['exp'], self.payload['exp'])
+        self.assertEqual(payload['origIat'], self.payload['origIat'])
+
+    @override_jwt_settings(JWT_SLIDING_REFRESH_THRESHOLD=timedelta(seconds=1))
+    def test_not_expiring(self):
+        response = self.middleware(self.request())
+        self.assertNotIn(jwt_settings.JWT_SLIDING_REFRESH_HEADER, response)
+
+    def test_refresh_expired(self):
+        with mock.patch.object(jwt_settings, 'JWT_REFRESH_EXPIRED_HANDLER',
+                               return_value=True):
+            response = self.middleware(self.request())
+
+        self.assertNotIn(jwt_settings.JWT_SLIDING_REFRESH_HEADER, response)
+
+    def test_reuses_verified_payload(self):
+        with mock.patch.object(jwt_settings, 'JWT_DECODE_HANDLER',
+                               wraps=jwt_settings.JWT_DECODE_HANDLER) as decode_mock:
+            self.middleware(self.request())
+
+        decode_mock.assert_called_once()
+
+    @override_jwt_settings(JWT_SLIDING_REFRESH=True,
+                           JWT_SLIDING_REFRESH_THRESHOLD=timedelta(minutes=10),
+                           JWT_CLAIMS_USER=True)
+    def test_claims_user_demoted(self):
+        self.user.is_staff = True
+        self.user.save()
+        self.token = jwt_encode(jwt_payload(self.user))
+
+        self.user.is_staff = False
+        self.user.save()
+        response = self.middleware(self.request())
+        payload = get_payload(response[jwt_settings.JWT_SLIDING_REFRESH_HEADER])
+
+        self.assertFalse(payload['isStaff'])
+
+        self.user.is_active = False
+        self.user.save()
+        self.get_response_mock.return_value = JsonResponse({})
+        response = self.middleware(self.request())
+
+        self.assertNotIn(jwt_settings.JWT_SLIDING_REFRESH_HEADER, response)
+
+    async def test_async(self):
+        get_response_mock = mock.AsyncMock(return_value=JsonResponse({}))
+        middleware = JSONWebTokenMiddleware(get_response_mock)
+        response = await middleware(self.request())
+
+        self.assertIn(jwt_settings.JWT_SLIDING_REFRESH_HEADER, response)
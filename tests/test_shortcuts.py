@@ -1,6 +1,12 @@
-from ariadne_jwt import shortcuts
+from unittest import mock
 
-from .testcases import UserTestCase
+from django.contrib.auth import get_user_model
+
+from ariadne_jwt import shortcuts, utils
+from ariadne_jwt.backends import JSONWebTokenBackend
+from ariadne_jwt.settings import jwt_settings
+
+from .testcases import TestCase, UserTestCase
 
 
 class ShortcutsTests(UserTestCase):
@@ -10,3 +16,75 @@ class ShortcutsTests(UserTestCase):
         user = shortcuts.get_user_by_token(token)
 
         self.assertEqual(user, self.user)
+
+
+class TokensTests(UserTestCase):
+
+    def test_get_tokens(self):
+        users = [self.user, get_user_model().objects.create_user(username='other')]
+        results = list(shortcuts.get_tokens(users, context=None, extra='value'))
+
+        for user, (result_user, token) in zip(users, results):
+            payload = utils.get_payload(token)
+
+            self.assertIs(result_user, user)
+            self.assertEqual(payload[user.USERNAME_FIELD], user.get_username())
+            self.assertEqual(payload['extra'], 'value')
+
+    def test_shared_claims_computed_once(self):
+        with mock.patch('ariadne_jwt.shortcuts.get_shared_claims',
+                        wraps=utils.get_shared_claims) as claims_mock:
+            list(shortcuts.get_tokens([self.user] * 3))
+
+        claims_mock.assert_called_once()
+
+    def test_generator(self):
+        users = mock.MagicMock()
+        users.__iter__.return_value = iter([self.user])
+        tokens = shortcuts.get_tokens(users)
+
+        users.__iter__.assert_not_called()
+        self.assertEqual(len(list(tokens)), 1)
+
+    def test_custom_handlers(self):
+        with mock.patch.object(jwt_settings, 'JWT_ENCODE_HANDLER',
+                               return_value='token') as encode_mock:
+            results = list(shortcuts.get_tokens([self.user]))
+
+        self.assertEqual(results, [(self.user, 'token')])
+        encode_mock.assert_called_once()
+
+
+class RequestPayloadTests(TestCase):
+
+    def test_get_request_payload(self):
+        headers = {
+            jwt_settings.JWT_AUTH_HEADER: '{0} {1}'.format(
+                jwt_settings.JWT_AUTH_HEADER_PREFIX,
+                self.token),
+        }
+        info = self.info(self.user, **headers)
+
+        with mock.patch.object(jwt_settings, 'JWT_DECODE_HANDLER',
+                               wraps=utils.jwt_decode) as decode_mock:
+            payload = shortcuts.get_request_payload(info)
+            self.assertIs(shortcuts.get_request_payload(info), payload)
+            self.assertIs(utils.get_payload(self.token, info.context), payload)
+
+        decode_mock.assert_called_once()
+        self.assertEqual(payload, self.payload)
+
+    def test_payload_stashed_by_backend(self):
+        headers = {
+            jwt_settings.JWT_AUTH_HEADER: '{0} {1}'.format(
+                jwt_settings.JWT_AUTH_HEADER_PREFIX,
+                self.token),
+        }
+        request = self.request_factory.get('/', **headers)
+        JSONWebTokenBackend().authenticate(request=request)
+
+        self.assertEqual(request.jwt_token, self.token)
+        self.assertEqual(request.jwt_payload, self.payload)
+
+    def test_missing_header(self):
+        self.assertIsNone(shortcuts.get_request_payload(self.info(self.user)))
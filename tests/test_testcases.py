@@ -0,0 +1,35 @@
+from ariadne import QueryType
+
+from ariadne_jwt.testcases import JSONWebTokenTestCase
+
+from .testcases import UserTestCase
+
+
+class JSONWebTokenClientTests(UserTestCase, JSONWebTokenTestCase):
+    type_defs = '''
+        type Query {
+            viewer: String
+        }
+        '''
+
+    def setUp(self):
+        super(JSONWebTokenClientTests, self).setUp()
+        query = QueryType()
+        query.set_field(
+            'viewer',
+            lambda obj, info: str(info.context['request'].user))
+        self.client.schema(self.type_defs, query)
+
+    def test_authenticated(self):
+        self.client.authenticate(self.user)
+        response = self.client.execute('{ viewer }')
+        self.assertEqual(response.data, {'viewer': self.user.get_username()})
+
+    def test_anonymous(self):
+        response = self.client.execute('{ viewer }')
+        self.assertEqual(response.data, {'viewer': 'AnonymousUser'})
+
+        self.client.authenticate(self.user)
+        self.client.logout()
+        response = self.client.execute('{ viewer }')
+        self.assertEqual(response.data, {'viewer': 'AnonymousUser'})
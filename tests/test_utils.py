@@ -1,7 +1,10 @@
 from datetime import timedelta
 from unittest.mock import patch, Mock, PropertyMock
 
+import jwt
+
 from ariadne_jwt import exceptions, utils
+from ariadne_jwt.mutations import resolve_refresh
 from ariadne_jwt.settings import jwt_settings
 
 from .decorators import override_jwt_settings
@@ -68,10 +71,128 @@ class UtilsTests(TestCase):
         with self.assertRaises(exceptions.JSONWebTokenError):
             utils.get_payload('invalid')
 
+    @override_jwt_settings(JWT_TOKEN_PRECHECK=True)
+    def test_token_precheck(self):
+        utils.precheck_stats.clear()
+        self.assertEqual(utils.get_payload(self.token), self.payload)
+
+        with patch.object(jwt_settings, 'JWT_DECODE_HANDLER') as decode_mock:
+            for token in ('a' * 9000, 'invalid', 'a.b.c=', 'a.b.c.d'):
+                with self.assertRaisesMessage(exceptions.JSONWebTokenError,
+                                              'Error decoding signature'):
+                    utils.get_payload(token)
+
+        decode_mock.assert_not_called()
+        self.assertEqual(utils.precheck_stats, {
+            'passed': 1,
+            'length': 1,
+            'format': 3,
+        })
+
+    def test_precheck_stats_thread_safe(self):
+        utils.precheck_stats.clear()
+
+        with utils.ThreadPoolExecutor(8) as executor:
+            for _ in executor.map(utils.count_precheck, ['passed'] * 10000):
+                pass
+
+        self.assertEqual(utils.precheck_stats['passed'], 10000)
+
+    def test_token_precheck_algorithm(self):
+        token = jwt.encode(self.payload, 'secret', 'HS512')
+
+        with override_jwt_settings(JWT_TOKEN_PRECHECK=True):
+            with self.assertRaisesMessage(exceptions.JSONWebTokenError,
+                                          'Invalid token'):
+                utils.get_payload(token)
+
+    def test_get_payloads(self):
+        with patch.object(jwt_settings, 'JWT_DECODE_HANDLER',
+                          wraps=utils.jwt_decode) as decode_mock:
+            payloads = utils.get_payloads([self.token, 'invalid', self.token])
+
+        self.assertEqual(decode_mock.call_count, 2)
+        self.assertEqual(payloads[0], self.payload)
+        self.assertIsInstance(payloads[1], exceptions.JSONWebTokenError)
+        self.assertEqual(payloads[2], self.payload)
+
+    @override_jwt_settings(JWT_BATCH_EXECUTOR='thread', JWT_BATCH_MAX_WORKERS=2)
+    @patch('ariadne_jwt.utils.is_symmetric', return_value=False)
+    def test_get_payloads_executor(self, *args):
+        executor_mock = Mock(wraps=utils.ThreadPoolExecutor)
+
+        context = {'request': None}
+
+        with patch.dict(utils.BATCH_EXECUTORS, thread=executor_mock), \
+                patch('ariadne_jwt.utils.get_payload',
+                      wraps=utils.get_payload) as get_payload_mock:
+            payloads = utils.get_payloads(['invalid', self.token], context)
+            utils.get_payloads(['invalid', self.token], context)
+
+        executor_mock.assert_called_once_with(2)
+        get_payload_mock.assert_any_call(self.token, context)
+        self.assertIsInstance(payloads[0], exceptions.JSONWebTokenError)
+        self.assertEqual(payloads[1], self.payload)
+
+    @patch('ariadne_jwt.utils.is_symmetric', return_value=False)
+    def test_get_payloads_process_executor(self, *args):
+        expired = utils.jwt_encode(dict(self.payload, exp=1))
+        request = self.request_factory.get('/')
+        stashed = {'stashed': True}
+        utils.set_request_payload(request, 'stashed', stashed)
+
+        with override_jwt_settings(JWT_BATCH_EXECUTOR='process',
+                                   JWT_BATCH_MAX_WORKERS=2,
+                                   JWT_TOKEN_CACHE=True,
+                                   JWT_REJECTED_TOKEN_CACHE=True,
+                                   JWT_VERIFY_EXPIRATION=True):
+            payloads = utils.get_payloads(
+                ['invalid', self.token, expired, 'stashed'],
+                {'request': request})
+
+            self.assertIsInstance(utils.get_batch_executor(),
+                                  utils.ProcessPoolExecutor)
+            self.assertEqual(utils.get_cached_payload(self.token),
+                             self.payload)
+            self.assertIsInstance(utils.get_cached_rejection(expired),
+                                  exceptions.JSONWebTokenExpired)
+
+        self.assertIsInstance(payloads[0], exceptions.JSONWebTokenError)
+        self.assertEqual(payloads[1], self.payload)
+        self.assertIsInstance(payloads[2], exceptions.JSONWebTokenExpired)
+        self.assertIs(payloads[3], stashed)
+
     def test_user_by_natural_key_not_exists(self):
         user = utils.get_user_by_natural_key(0)
         self.assertIsNone(user)
 
+    @override_jwt_settings(JWT_USER_PK_CLAIM='userId')
+    def test_user_by_pk_claim(self):
+        payload = utils.jwt_payload(self.user)
+        self.assertEqual(payload['userId'], self.user.pk)
+
+        with patch('ariadne_jwt.utils.get_user_by_natural_key') as natural_key_mock:
+            user = utils.get_user_by_payload(payload)
+
+        natural_key_mock.assert_not_called()
+        self.assertEqual(user, self.user)
+
+    @override_jwt_settings(JWT_USER_PK_CLAIM='userId')
+    def test_user_by_payload_without_pk_claim(self):
+        self.assertEqual(utils.get_user_by_payload(self.payload), self.user)
+
+    def test_user_queryset_handler(self):
+        queryset = Mock(**{'get.return_value': self.user})
+
+        with override_jwt_settings(JWT_USER_QUERYSET_HANDLER=lambda: queryset):
+            user = utils.get_user_by_pk(self.user.pk)
+
+        queryset.get.assert_called_once_with(pk=self.user.pk)
+        self.assertEqual(user, self.user)
+
+    def test_user_by_pk_not_exists(self):
+        self.assertIsNone(utils.get_user_by_pk(0))
+
     def test_user_by_invalid_payload(self):
         with self.assertRaises(exceptions.JSONWebTokenError):
             utils.get_user_by_payload({})
@@ -82,3 +203,64 @@ class UtilsTests(TestCase):
 
         with self.assertRaises(exceptions.JSONWebTokenError):
             utils.get_user_by_payload(payload)
+
+
+class CompactClaimsTests(TestCase):
+
+    @override_jwt_settings(JWT_COMPACT_CLAIMS=True)
+    def test_compact_token(self):
+        token = utils.jwt_encode(self.payload)
+        decoded = jwt.decode(token, options={'verify_signature': False})
+
+        self.assertLess(len(token), len(self.token))
+        self.assertIn('oi', decoded)
+        self.assertEqual(decoded['u'], self.user.get_username())
+        self.assertEqual(utils.get_payload(token), self.payload)
+
+    @override_jwt_settings(JWT_COMPACT_CLAIMS=True, JWT_USER_PK_CLAIM='userId')
+    def test_numeric_id(self):
+        payload = utils.jwt_payload(self.user)
+        token = utils.jwt_encode(payload)
+        decoded = jwt.decode(token, options={'verify_signature': False})
+
+        self.assertEqual(decoded['uid'], self.user.pk)
+        self.assertNotIn('u', decoded)
+        self.assertEqual(utils.get_user_by_payload(decoded), self.user)
+        self.assertEqual(utils.get_payload(token)['userId'], self.user.pk)
+
+    @override_jwt_settings(JWT_COMPACT_CLAIMS=True)
+    def test_long_format_accepted(self):
+        self.assertEqual(utils.get_payload(self.token), self.payload)
+
+    def test_long_format_extra_claims(self):
+        payload = dict(self.payload, u='other')
+        self.assertEqual(utils.expand_payload(payload), payload)
+
+        with override_jwt_settings(JWT_USER_PK_CLAIM='userId'):
+            payload = dict(utils.jwt_payload(self.user), uid=99)
+            self.assertEqual(utils.expand_payload(payload), payload)
+            self.assertEqual(utils.get_user_by_payload(payload), self.user)
+
+    @override_jwt_settings(JWT_COMPACT_CLAIMS=True)
+    def test_compact_extra_claims(self):
+        payload = dict(self.payload, u='other', oi=1)
+        token = utils.jwt_encode(payload)
+
+        self.assertEqual(utils.get_payload(token), payload)
+        self.assertEqual(utils.get_user_by_payload(utils.get_payload(token)),
+                         self.user)
+
+    def test_compact_accepted_when_disabled(self):
+        with override_jwt_settings(JWT_COMPACT_CLAIMS=True):
+            token = utils.jwt_encode(self.payload)
+
+        self.assertEqual(utils.get_payload(token), self.payload)
+
+    @override_jwt_settings(JWT_COMPACT_CLAIMS=True)
+    def test_refresh(self):
+        token = utils.jwt_encode(self.payload)
+        result = resolve_refresh(None, self.info(self.user), token)
+        decoded = jwt.decode(result['token'],
+                             options={'verify_signature': False})
+
+        self.assertEqual(decoded['oi'], self.payload['origIat'])
@@ -0,0 +1,166 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser, Permission
+
+import ariadne
+from ariadne import QueryType
+
+from ariadne_jwt import jwt_directives, jwt_schema, jwt_validation_rules
+from ariadne_jwt.decorators import (permission_required,
+                                    staff_member_required)
+from ariadne_jwt.validation import get_operation_cache
+
+from .decorators import override_jwt_settings
+from .testcases import TestCase
+
+
+class OperationAuthorizationTests(TestCase):
+    type_defs = '''
+        type Query {
+            viewer: String @loginRequired
+            staff: String
+            public: String
+        }
+        ''' + jwt_schema
+
+    def setUp(self):
+        super(OperationAuthorizationTests, self).setUp()
+        self.resolve_public = mock.Mock(spec=lambda obj, info: None,
+                                        return_value='ok')
+        query = QueryType()
+        query.set_field('viewer', lambda obj, info: 'ok')
+        query.set_field('staff', staff_member_required(
+            lambda obj, info: 'ok'))
+        query.set_field('public', self.resolve_public)
+        self.schema = ariadne.make_executable_schema(
+            self.type_defs, query, directives=jwt_directives)
+
+    def execute(self, query, user, operation_name=None):
+        request = self.request_factory.post('/')
+        request.user = user
+        success, result = ariadne.graphql_sync(
+            self.schema,
+            {'query': query, 'operationName': operation_name},
+            context_value={'request': request},
+            validation_rules=jwt_validation_rules)
+        return result
+
+    def test_denied_before_execution(self):
+        result = self.execute('{ public viewer }', AnonymousUser())
+
+        self.assertNotIn('data', result)
+        self.assertEqual(result['errors'][0]['message'],
+                         'You do not have permission to perform this action')
+        self.resolve_public.assert_not_called()
+
+    def test_authorized(self):
+        result = self.execute('{ public viewer }', self.user)
+        self.assertEqual(result['data'], {'public': 'ok', 'viewer': 'ok'})
+
+    def test_decorator_requirements(self):
+        result = self.execute('{ public staff }', self.user)
+        self.assertNotIn('data', result)
+
+    def test_fragments(self):
+        query = '''
+            query Viewer { ...Fields }
+            fragment Fields on Query { viewer }
+            '''
+        result = self.execute(query, AnonymousUser(), 'Viewer')
+        self.assertNotIn('data', result)
+
+    def test_selected_operation(self):
+        query = '''
+            query Public { public }
+            query Viewer { viewer }
+            '''
+        result = self.execute(query, AnonymousUser(), 'Public')
+        self.assertEqual(result['data'], {'public': 'ok'})
+
+    def test_conditional_fields_left_to_resolvers(self):
+        query = '{ public viewer @include(if: false) }'
+        result = self.execute(query, AnonymousUser())
+        self.assertEqual(result['data'], {'public': 'ok'})
+
+    def test_request_without_user(self):
+        request = self.request_factory.post('/')
+        success, result = ariadne.graphql_sync(
+            self.schema,
+            {'query': '{ public viewer }'},
+            context_value={'request': request},
+            validation_rules=jwt_validation_rules)
+
+        self.assertNotIn('data', result)
+        self.assertEqual(result['errors'][0]['message'],
+                         'You do not have permission to perform this action')
+
+    def test_cache_cleared_on_reload(self):
+        self.execute('{ viewer }', self.user)
+
+        with override_jwt_settings(JWT_OPERATION_CACHE_MAX_SIZE=1):
+            cache = get_operation_cache(self.schema)
+
+        self.assertEqual(cache.max_size, 1)
+        self.assertEqual(len(cache), 0)
+
+    def test_requirements_cached(self):
+        self.execute('{ viewer }', self.user)
+
+        with mock.patch('ariadne_jwt.validation.Definition') as definition:
+            result = self.execute('{ viewer }', AnonymousUser())
+
+        definition.assert_not_called()
+        self.assertNotIn('data', result)
+
+
+class AsyncOperationAuthorizationTests(TestCase):
+    type_defs = '''
+        type Query {
+            viewer: String @loginRequired
+            users: String
+            public: String
+        }
+        ''' + jwt_schema
+
+    def setUp(self):
+        super(AsyncOperationAuthorizationTests, self).setUp()
+
+        @permission_required('auth.view_user')
+        async def resolve_users(obj, info):
+            return 'ok'
+
+        query = QueryType()
+        query.set_field('viewer', lambda obj, info: 'ok')
+        query.set_field('users', resolve_users)
+        query.set_field('public', lambda obj, info: 'ok')
+        self.schema = ariadne.make_executable_schema(
+            self.type_defs, query, directives=jwt_directives)
+
+    async def execute(self, query, user):
+        request = self.request_factory.post('/')
+        request.user = user
+        success, result = await ariadne.graphql(
+            self.schema,
+            {'query': query},
+            context_value={'request': request},
+            validation_rules=jwt_validation_rules)
+        return result
+
+    async def test_denied_before_execution(self):
+        result = await self.execute('{ public viewer }', AnonymousUser())
+        self.assertNotIn('data', result)
+
+    async def test_permissions_left_to_resolvers(self):
+        result = await self.execute('{ public users }', self.user)
+
+        self.assertEqual(result['data'], {'public': 'ok', 'users': None})
+        self.assertEqual(result['errors'][0]['message'],
+                         'You do not have permission to perform this action')
+
+        perm = await Permission.objects.aget(codename='view_user')
+        await self.user.user_permissions.aadd(perm)
+        user = await get_user_model().objects.aget(pk=self.user.pk)
+        result = await self.execute('{ public users }', user)
+
+        self.assertEqual(result['data'], {'public': 'ok', 'users': 'ok'})